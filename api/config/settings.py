@@ -6,15 +6,32 @@ load_dotenv(dotenv_path=dotenv_path, override=True)
 LOGS_BASE = os.path.join(BASE_DIR, os.getenv("LOGS_BASE", "api/logs"))
 LOGS_DIR = os.path.join(BASE_DIR, os.getenv("LOGS_DIR", "api/logs/logs"))
 FINAL_LOGS_DIR = os.path.join(BASE_DIR, os.getenv("FINAL_LOGS_DIR", "api/logs/final_logs"))
+OFFSET_CACHE_PATH = os.path.join(BASE_DIR, os.getenv("OFFSET_CACHE_PATH", "api/logs/final_logs/offset_cache.json"))
 RUN_LOGS_DIR = os.path.join(BASE_DIR, os.getenv("RUN_LOGS_DIR", "api/logs/run_logs"))
 LOG_CONFIG_PATH = os.path.join(BASE_DIR, os.getenv("LOG_CONFIG_PATH", "api/config/logging.yaml"))
 FILE_HANDLING_DIR = os.path.join(BASE_DIR, os.getenv("FILE_HANDLING_DIR", "api/file_handling"))
 TEMP_PROCESSING_DIR = os.path.join(BASE_DIR, os.getenv("TEMP_PROCESSING_DIR", "api/file_handling/temp_input"))
+INTERMEDIATE_DIR = os.path.join(BASE_DIR, os.getenv("INTERMEDIATE_DIR", TEMP_PROCESSING_DIR))
+SHM_SCRATCH_DIR = os.getenv("SHM_SCRATCH_DIR", "/dev/shm/sync-api")
 FINAL_OUTPUT_DIR = os.path.join(BASE_DIR, os.getenv("FINAL_OUTPUT_DIR", "api/file_handling/final_output"))
 DATA_WORK_PYAVI_DIR = os.path.join(BASE_DIR, os.getenv("DATA_WORK_PYAVI_DIR", "syncnet_python/data/work/pyavi"))
 DATA_WORK_DIR = os.path.join(BASE_DIR, os.getenv("DATA_WORK_DIR", "syncnet_python/data/work"))
 DATA_DIR = os.path.join(BASE_DIR, os.getenv("DATA_DIR", "syncnet_python/data"))
 DEFAULT_MAX_ITERATIONS = int(os.getenv("DEFAULT_MAX_ITERATIONS", 30))
+MIN_SYNC_DURATION_S = float(os.getenv("MIN_SYNC_DURATION_S", 4.0))
+SYNC_BATCH_CONCURRENCY = int(os.getenv("SYNC_BATCH_CONCURRENCY", max(1, (os.cpu_count() or 2) // 2)))
+FFMPEG_THREADS = os.getenv("FFMPEG_THREADS", "0")
+FFMPEG_TIMEOUT_S = float(os.getenv("FFMPEG_TIMEOUT_S", 3600))
+SYNCNET_DEBUG_LOGS = os.getenv("SYNCNET_DEBUG_LOGS", "false").lower() in ("1", "true", "yes")
+STRICT_VERIFY = os.getenv("STRICT_VERIFY", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_FINALIZE = os.getenv("SPECULATIVE_FINALIZE", "false").lower() in ("1", "true", "yes")
+REMUX_FINAL_SHIFT = os.getenv("REMUX_FINAL_SHIFT", "true").lower() in ("1", "true", "yes")
+SYNCNET_SOCKET_PATH = os.path.join(BASE_DIR, os.getenv("SYNCNET_SOCKET_PATH", "api/syncnet.sock"))
+SYNCNET_MODEL_PATH = os.path.join(BASE_DIR, os.getenv("SYNCNET_MODEL_PATH", "syncnet_python/data/syncnet_v2.model"))
+SYNCNET_AUTOSTART = os.getenv("SYNCNET_AUTOSTART", "true").lower() in ("1", "true", "yes")
+SYNCNET_FP16 = os.getenv("SYNCNET_FP16", "false").lower() in ("1", "true", "yes")
+SYNCNET_TIMEOUT_S = float(os.getenv("SYNCNET_TIMEOUT_S", 3600))
+SYNCNET_GPUS = [gpu.strip() for gpu in os.getenv("SYNCNET_GPUS", "").split(",") if gpu.strip()]
 TEST_DATA_DIR = os.path.join(BASE_DIR, os.getenv("TEST_DATA_DIR", "api/tests/test_data"))
 ALLOWED_LOCAL_1 = os.getenv("ALLOWED_LOCAL_1", "http://localhost:3000")
 ALLOWED_LOCAL_2 = os.getenv("ALLOWED_LOCAL_2", "http://127.0.0.1:3000")
@@ -1,6 +1,7 @@
 from fastapi import WebSocket
-from typing import List
+from typing import Any, Dict, List, Union
 import asyncio
+import json
 
 active_connections: List[WebSocket] = []
 
@@ -27,6 +28,22 @@ async def broadcast(message: str) -> None:
         *[conn.send_text(message) for conn in active_connections],
         return_exceptions=True
     )
+
+async def broadcast_batch(messages: List[Union[str, Dict[str, Any]]]) -> None:
+    """
+    Sends a batch of messages to all active WebSocket connections in one frame.
+
+    The frame is always a JSON object of the form {"messages": [...]}, even for
+    a single message, so clients only ever parse one shape. The frame is
+    serialised once here, so dict messages appear in it as JSON objects.
+
+    Args:
+        messages (List[Union[str, Dict[str, Any]]]): The messages to broadcast, oldest first.
+    """
+    if not messages:
+        return
+    await broadcast(json.dumps({"messages": messages}))
+
 def disconnect(websocket: WebSocket) -> None:
     """
     Removes a WebSocket connection from the active connections list.
@@ -6,6 +6,8 @@ import logging
 from typing import List
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from api.config.settings import SYNCNET_AUTOSTART
+from api.utils.syncnet_utils import SyncNetUtils
 from api.routes.processing_routes import router as processing_router
 from api.routes.file_routes import router as file_router
 from api.routes.ws_routes import router as ws_router
@@ -22,3 +24,28 @@ app.add_middleware(
 app.include_router(processing_router)
 app.include_router(file_router)
 app.include_router(ws_router)
+
+
+@app.on_event("startup")
+async def start_syncnet_server() -> None:
+    """Starts the resident SyncNet server so sync passes skip interpreter and model start-up."""
+    app.state.syncnet_server = await SyncNetUtils.start_server() if SYNCNET_AUTOSTART else None
+
+
+@app.on_event("shutdown")
+async def cancel_verifications() -> None:
+    """Stops background verifications so none is cut off mid-run by the loop closing or the server stopping."""
+    await SyncNetUtils.cancel_verifications()
+
+
+@app.on_event("shutdown")
+async def stop_syncnet_server() -> None:
+    """Stops the SyncNet server started with the app, if any."""
+    if getattr(app.state, "syncnet_server", None) is not None:
+        await SyncNetUtils.stop_server(app.state.syncnet_server)
+
+
+@app.on_event("shutdown")
+async def flush_log_writes() -> None:
+    """Lets logs still being written in the background reach disk."""
+    await SyncNetUtils.flush_writes()
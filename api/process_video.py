@@ -1,5 +1,7 @@
+import asyncio
 import logging
-from typing import Dict, Union
+from typing import Dict, List, Tuple, Union
+from api.config.settings import SYNC_BATCH_CONCURRENCY
 from api.utils.api_utils import ApiUtils
 from api.utils.syncnet_utils import SyncNetUtils
 from api.types.props import SyncError, ProcessSuccess, ProcessError
@@ -23,7 +25,9 @@ Overview:
          - Invokes the SyncNet pipeline and model asynchronously to determine audio-video offset.
          - Performs iterative synchronization adjustments if the video is out-of-sync.
       3. **Verification:**
-         - Verifies the final synchronization by running a verification pipeline.
+         - Verifies the final synchronization once. Runs that did not converge are checked before the
+           response is returned; converged runs are checked in a background task whose result is
+           delivered over WebSocket afterwards.
       4. **Broadcasting Updates:**
          - Sends status messages via WebSocket to inform clients of progress.
 
@@ -72,6 +76,11 @@ Function:
     Raises:
         RuntimeError: Propagates any error encountered during video processing.
 
+Function:
+    async def process_videos(jobs: List[Tuple[str, str]]) -> List[Union[ProcessSuccess, ProcessError]]:
+        Runs process_video for several files concurrently, at most SYNC_BATCH_CONCURRENCY at a time,
+        and returns one result per job in the order given.
+
 Usage Example:
     async def main():
         result = await process_video("path/to/video.mp4", "video.mp4")
@@ -97,7 +106,8 @@ async def process_video(input_file: str, original_filename: str) -> Union[Proces
       2. Synchronizes the video using the SyncNet pipeline:
          - Invokes asynchronous methods to run the SyncNet model and pipeline.
          - Iteratively adjusts the video based on the computed audio-video offset.
-      3. Verifies the final synchronization by running an asynchronous verification process.
+      3. Verifies the final output once, inside synchronize_video: synchronously for runs that did
+         not converge, in a background task reporting over WebSocket for runs that did.
       4. Sends WebSocket messages to broadcast status updates to the client throughout the process.
 
     Concurrency and Threading:
@@ -155,8 +165,6 @@ async def process_video(input_file: str, original_filename: str) -> Union[Proces
         
         final_output, already_in_sync = result_tuple
         if not already_in_sync:
-            ref_str: str = f"{reference_number:05d}"
-            await SyncNetUtils.verify_synchronization(final_output, ref_str, fps)
             ApiUtils.send_websocket_message("Click the orange circle tick below to get your file! Thanks")
             return ProcessSuccess(
                 status="success",
@@ -198,3 +206,30 @@ async def process_video(input_file: str, original_filename: str) -> Union[Proces
                 error=True,
                 message=err_text
             )
+
+
+async def process_videos(jobs: List[Tuple[str, str]]) -> List[Union[ProcessSuccess, ProcessError]]:
+    """
+    Processes several video files concurrently.
+
+    Each job runs process_video in its own task. At most SYNC_BATCH_CONCURRENCY jobs run at once,
+    so FFmpeg work for one clip overlaps SyncNet work for another without oversubscribing the host.
+    Jobs never share working files, since every clip gets its own block of reference numbers.
+    The SyncNet server runs at most one pipeline run and one SyncNet evaluation at a time, so one
+    job's S3FD face detection can share the GPU with another job's SyncNet evaluation; jobs that fall
+    back to subprocesses are not limited at all beyond SYNC_BATCH_CONCURRENCY.
+
+    Args:
+        jobs (List[Tuple[str, str]]): (input_file, original_filename) pairs to process.
+
+    Returns:
+        List[Union[ProcessSuccess, ProcessError]]: One result per job, in the order the jobs were given.
+    """
+    semaphore = asyncio.Semaphore(max(1, SYNC_BATCH_CONCURRENCY))
+
+    async def run_job(input_file: str, original_filename: str) -> Union[ProcessSuccess, ProcessError]:
+        async with semaphore:
+            return await process_video(input_file, original_filename)
+
+    logger.info(f"[process_videos] Processing {len(jobs)} videos, {SYNC_BATCH_CONCURRENCY} at a time")
+    return list(await asyncio.gather(*(run_job(input_file, name) for input_file, name in jobs)))
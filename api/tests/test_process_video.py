@@ -8,6 +8,7 @@ Description:
       - Handling of a video file with no audio stream.
       - Handling of a non-existent (invalid) video file.
       - Handling of an already synchronized video.
+      - Running a batch of videos with bounded concurrency.
 
     The tests use Python's built-in unittest framework and asyncio to run asynchronous code.
 """
@@ -15,8 +16,9 @@ Description:
 import os
 import unittest
 import asyncio
+from unittest.mock import patch
 from api.config.settings import TEST_DATA_DIR, FINAL_OUTPUT_DIR
-from api.process_video import process_video
+from api.process_video import process_video, process_videos
 from api.types.props import ProcessSuccess, ProcessError
 
 
@@ -133,6 +135,31 @@ class TestRunProcessVideo(unittest.TestCase):
                             "Final output file should exist for an already synchronized video")
             os.remove(final_output)
 
+    def test_process_videos_limits_concurrency(self):
+        """Tests that process_videos keeps job order and never exceeds SYNC_BATCH_CONCURRENCY.
+
+        Raises:
+            AssertionError: If any expected condition is not met.
+        """
+        running = []
+        peak = []
+
+        async def fake_process_video(input_file, original_filename):
+            running.append(input_file)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.remove(input_file)
+            return ProcessSuccess(status="success", final_output=input_file, message=original_filename)
+
+        jobs = [(f"in_{i}.avi", f"clip_{i}.avi") for i in range(5)]
+        with patch("api.process_video.process_video", side_effect=fake_process_video), \
+             patch("api.process_video.SYNC_BATCH_CONCURRENCY", 2):
+            results = self.loop.run_until_complete(process_videos(jobs))
+
+        self.assertEqual([r.final_output for r in results], [job[0] for job in jobs],
+                         "Results should come back in job order")
+        self.assertEqual(max(peak), 2, "No more than SYNC_BATCH_CONCURRENCY jobs should run at once")
+
     @classmethod
     def tearDownClass(cls):
         """Cleans up test artifacts after all tests have run.
@@ -100,6 +100,27 @@ class TestAnalysisUtils(unittest.TestCase):
         result = AnalysisUtils.aggregate_confidence(pairs)
         self.assertEqual(result, expected)
 
+    def test_aggregate_log_confidence_matches_pairwise(self):
+        """Tests aggregate_log_confidence against the per-pair extract/aggregate path.
+
+        Verifies that the vectorized aggregation produces the same sums and the same
+        first-occurrence key order, so ties resolve to the same best offset.
+
+        Expected Output:
+            {3: 2.0, -2: 2.0, 5: 0.25}, identical to the per-pair result.
+        """
+        log_text = (
+            "AV offset:   3\nConfidence:  1.5\n"
+            "AV offset:   -2\nConfidence:  2.0\n"
+            "AV offset:   3\nConfidence:  0.5\n"
+            "AV offset:   5\nConfidence:  0.25\n"
+        )
+        expected = AnalysisUtils.aggregate_confidence(AnalysisUtils.extract_offset_confidence_pairs(log_text))
+        result = AnalysisUtils.aggregate_log_confidence(log_text)
+        self.assertEqual(result, {3: 2.0, -2: 2.0, 5: 0.25})
+        self.assertEqual(list(result.items()), list(expected.items()),
+                         "Vectorized aggregation should match the per-pair path, including order.")
+
     def test_analyze_syncnet_log_valid_log_content(self):
         """Tests analyze_syncnet_log with valid log content.
 
@@ -185,6 +206,35 @@ class TestAnalysisUtils(unittest.TestCase):
         finally:
             os.remove(tmp_log_path)
 
+    def test_analyze_syncnet_bytes_valid_content(self):
+        """Tests analyze_syncnet_bytes with in-memory SyncNet output.
+
+        Verifies that parsing captured bytes gives the same offset as parsing the equivalent log file.
+
+        Expected Output:
+            best_offset_ms equals -280 when the fps is 25.0.
+        """
+        buf = (
+            b"AV offset:   -7\n"
+            b"Confidence:  3.162\n"
+            b"AV offset:   15\n"
+            b"Confidence:  0.412\n"
+            b"AV offset:   -7\n"
+            b"Confidence:  8.789\n"
+        )
+        result = self._run_async(AnalysisUtils.analyze_syncnet_bytes(buf, 25.0))
+        self.assertEqual(result.best_offset_ms, -280,
+                         "Was expecting the correct offset in ms from in-memory output.")
+
+    def test_analyze_syncnet_bytes_empty_content(self):
+        """Tests analyze_syncnet_bytes with an empty buffer.
+
+        Expected Output:
+            best_offset_ms equals 0.
+        """
+        result = self._run_async(AnalysisUtils.analyze_syncnet_bytes(b"", 25.0))
+        self.assertEqual(result.best_offset_ms, 0, "Expected 0 ms for empty output.")
+
     def test_extract_offset_confidence_pairs_valid_log_content(self):
         """Tests extract_offset_confidence_pairs with valid log content.
 
@@ -0,0 +1,140 @@
+"""
+Tests for the ApiUtils WebSocket message batching and subprocess helpers.
+
+The tests cover the following functionality:
+- Coalescing messages posted close together into one broadcast.
+- Sending a lone message in the same batch shape.
+- Keeping only the newest progress update per stage in a batch.
+- Dropping the oldest messages once the queue is full.
+- Killing child processes that run past their timeout.
+"""
+import sys
+import json
+import asyncio
+import unittest
+from unittest.mock import patch
+from api.utils.api_utils import ApiUtils, WS_QUEUE_MAX
+
+
+class TestApiUtils(unittest.TestCase):
+    """Test suite for the ApiUtils class."""
+
+    def setUp(self):
+        """Set up a fresh event loop for each test."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        """Close the event loop created for the test."""
+        self.loop.close()
+
+    def async_test(f):
+        """Decorator to run async test methods in the event loop.
+
+        Args:
+            f (Callable): The asynchronous test function to wrap.
+
+        Returns:
+            Callable: A wrapper function that runs the test in the event loop.
+        """
+        def wrapper(*args, **kwargs):
+            return args[0].loop.run_until_complete(f(*args, **kwargs))
+        return wrapper
+
+    @async_test
+    async def test_send_websocket_message_batches(self):
+        """Tests that messages posted back to back go out as one JSON batch."""
+        sent = []
+
+        async def fake_broadcast(message):
+            sent.append(message)
+
+        with patch("api.connection_manager.broadcast", side_effect=fake_broadcast):
+            for i in range(3):
+                ApiUtils.send_websocket_message(f"message {i}")
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(len(sent), 1, "Messages should be coalesced into one broadcast.")
+        self.assertEqual(json.loads(sent[0]), {"messages": ["message 0", "message 1", "message 2"]})
+
+    @async_test
+    async def test_send_websocket_message_single(self):
+        """Tests that a lone message is sent in the same batch shape as several."""
+        sent = []
+
+        async def fake_broadcast(message):
+            sent.append(message)
+
+        with patch("api.connection_manager.broadcast", side_effect=fake_broadcast):
+            ApiUtils.send_websocket_message("only message")
+            await asyncio.sleep(0.05)
+
+        self.assertEqual([json.loads(frame) for frame in sent], [{"messages": ["only message"]}])
+
+    @async_test
+    async def test_update_progress_keeps_latest(self):
+        """Tests that superseded updates of a stage are dropped, other stages kept and templates filled in."""
+        sent = []
+
+        async def fake_broadcast(message):
+            sent.append(message)
+
+        with patch("api.connection_manager.broadcast", side_effect=fake_broadcast), \
+                patch("api.utils.api_utils.active_connections", [object()]):
+            ApiUtils.update_progress(1, "shifting", "Pass {iteration}: shifting to {total_shift_ms} ms", total_shift_ms=20)
+            ApiUtils.update_progress(1, "analyzed", "{offset_ms} ms out", offset_ms=40)
+            ApiUtils.send_websocket_message("plain message")
+            ApiUtils.update_progress(1, "shifting", "Pass {iteration}: shifting to {total_shift_ms} ms", total_shift_ms=40)
+            await asyncio.sleep(0.05)
+
+        self.assertEqual(len(sent), 1)
+        messages = json.loads(sent[0])["messages"]
+        self.assertEqual(len(messages), 3, "Only the superseded 'shifting' update should be dropped.")
+        self.assertEqual(
+            messages[0],
+            {"progress": {"iteration": 1, "stage": "analyzed", "message": "40 ms out", "offset_ms": 40}},
+            "An update for a different stage should survive a later one."
+        )
+        self.assertEqual(messages[1], "plain message")
+        self.assertEqual(
+            messages[2],
+            {"progress": {"iteration": 1, "stage": "shifting", "message": "Pass 1: shifting to 40 ms", "total_shift_ms": 40}}
+        )
+
+    @async_test
+    async def test_send_websocket_message_drops_oldest_when_full(self):
+        """Tests that a full queue drops its oldest messages instead of growing or blocking."""
+        sent = []
+
+        async def fake_broadcast(message):
+            sent.append(message)
+
+        with patch("api.connection_manager.broadcast", side_effect=fake_broadcast):
+            for i in range(WS_QUEUE_MAX + 6):
+                ApiUtils.send_websocket_message(f"message {i}")
+            await asyncio.sleep(0.1)
+
+        received = [m for frame in sent for m in json.loads(frame)["messages"]]
+        self.assertEqual(received, [f"message {i}" for i in range(6, WS_QUEUE_MAX + 6)])
+
+    @async_test
+    async def test_communicate_kills_hung_process(self):
+        """Tests that a child running past its timeout is killed, reaped and reported."""
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", "import time; time.sleep(30)", stdout=asyncio.subprocess.PIPE
+        )
+        with self.assertRaises(RuntimeError) as ctx:
+            await ApiUtils.communicate(process, 0.2, "SyncNet for reference 00001")
+        self.assertIn("SyncNet for reference 00001", str(ctx.exception))
+        self.assertIn("timed out", str(ctx.exception))
+        self.assertIsNotNone(process.returncode, "The hung child should have been reaped.")
+
+    def test_update_progress_without_listeners(self):
+        """Tests that no message is queued when no client is connected."""
+        with patch("api.utils.api_utils.ApiUtils.send_websocket_message") as mock_send:
+            ApiUtils.update_progress(1, "pipeline", "Pass number 1 in progress...")
+        mock_send.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
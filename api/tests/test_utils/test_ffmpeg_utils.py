@@ -78,6 +78,22 @@ class TestFFmpegUtils(unittest.TestCase):
         self.assertIn('codec_name', props)
         self.assertIn('avg_frame_rate', props)
 
+    def test_get_stream_properties_success(self):
+        """Test that get_stream_properties returns both video and audio props from one probe.
+
+        The test probes a valid video file twice and asserts that both dictionaries are
+        populated and that the second call returns the cached result.
+        """
+        vid_props, audio_props = self.loop.run_until_complete(
+            FFmpegUtils.get_stream_properties(self.example_video)
+        )
+        self.assertIn('fps', vid_props)
+        self.assertIn('codec_name', audio_props)
+        cached = self.loop.run_until_complete(
+            FFmpegUtils.get_stream_properties(self.example_video)
+        )
+        self.assertEqual(cached, (vid_props, audio_props), "Second probe should hit the cache.")
+
     def test_shift_audio_success(self):
         """Test that shift_audio creates a non-empty output file for a valid video input.
 
@@ -97,18 +113,19 @@ class TestFFmpegUtils(unittest.TestCase):
             shutil.rmtree(temp_dir)
 
     def test_shift_audio_nonexistent_file(self):
-        """Test that shift_audio does not create an output file when the input file does not exist.
+        """Test that shift_audio raises and creates no output file when the input file does not exist.
 
-        The test attempts to shift audio for a non-existent file and asserts that no output
-        file is created.
+        The test attempts to shift audio for a non-existent file and asserts that a RuntimeError
+        is raised and no output file is created.
         """
         nonexistent_file = os.path.join(TEST_DATA_DIR, "nonexistent.avi")
         temp_dir = tempfile.mkdtemp()
         output_file = os.path.join(temp_dir, "output.avi")
         try:
-            self.loop.run_until_complete(
-                FFmpegUtils.shift_audio(nonexistent_file, output_file, 100)
-            )
+            with self.assertRaises(RuntimeError):
+                self.loop.run_until_complete(
+                    FFmpegUtils.shift_audio(nonexistent_file, output_file, 100)
+                )
             self.assertFalse(os.path.exists(output_file), "Output file should not be created for a nonexistent input.")
         finally:
             shutil.rmtree(temp_dir)
@@ -136,6 +153,25 @@ class TestFFmpegUtils(unittest.TestCase):
             if os.path.exists(temp_copy):
                 os.remove(temp_copy)
 
+    def test_apply_shift_and_restore_success(self):
+        """Test that apply_shift_and_restore writes the shifted file in the target container.
+
+        The test shifts a valid input video and writes it straight to a .mkv container in a
+        single ffmpeg pass. It asserts that the output exists, is non-empty and still has audio.
+        """
+        temp_dir = tempfile.mkdtemp()
+        final_output = os.path.join(temp_dir, "final_shifted_example_restored.mkv")
+        try:
+            self.loop.run_until_complete(
+                FFmpegUtils.apply_shift_and_restore(self.example_video, final_output, -150, ".mkv", None, None)
+            )
+            self.assertTrue(os.path.exists(final_output), "Restored output file should exist.")
+            self.assertGreater(os.path.getsize(final_output), 0, "Restored output file should not be empty.")
+            audio_props = self.loop.run_until_complete(FFmpegUtils.get_audio_properties(final_output))
+            self.assertIsNotNone(audio_props, "Restored output should keep its audio stream.")
+        finally:
+            shutil.rmtree(temp_dir)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the FileUtils reference number allocation and file copies.
+
+The tests cover the following functionality:
+- Seeding the counter from the directories already present.
+- Handing out disjoint blocks to allocators that share a directory.
+- Falling back to a byte copy when the filesystem cannot reflink.
+- Raising copy errors that a fallback could not fix.
+"""
+import os
+import errno
+import shutil
+import asyncio
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from api.utils.file_utils import FileUtils, REF_COUNTER_FILE
+
+
+class TestFileUtils(unittest.TestCase):
+    """Test suite for the FileUtils class."""
+
+    def setUp(self):
+        """Set up a fresh event loop and an empty data directory for each test."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Close the event loop and remove the data directory."""
+        self.loop.close()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_get_next_directory_number_seeds_from_existing(self):
+        """Tests that the first allocation continues after the highest existing directory."""
+        for name in ("00003", "00007", "not_a_ref"):
+            os.makedirs(os.path.join(self.data_dir, name))
+
+        first = self.loop.run_until_complete(FileUtils.get_next_directory_number(self.data_dir, reserve=4))
+        second = self.loop.run_until_complete(FileUtils.get_next_directory_number(self.data_dir))
+
+        self.assertEqual((first, second), ("00008", "00012"))
+        self.assertTrue(os.path.isfile(os.path.join(self.data_dir, REF_COUNTER_FILE)))
+
+    def test_get_next_directory_number_blocks_are_disjoint(self):
+        """Tests that allocators racing on one directory, as separate workers would, never overlap."""
+        reserve = 5
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            firsts = list(pool.map(lambda _: int(FileUtils._take_numbers(self.data_dir, reserve)), range(40)))
+
+        numbers = [first + i for first in firsts for i in range(reserve)]
+        self.assertEqual(len(numbers), len(set(numbers)), "Two allocations handed out the same number.")
+        self.assertEqual(sorted(firsts), list(range(1, 40 * reserve, reserve)))
+
+    def _write_source(self):
+        """Write a small source file into the data directory and return its path."""
+        source = os.path.join(self.data_dir, "source.avi")
+        with open(source, "wb") as f:
+            f.write(b"frames" * 1000)
+        return source
+
+    @patch("api.utils.file_utils.fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "Operation not supported"))
+    def test_copy_falls_back_when_reflink_unsupported(self, mock_ioctl):
+        """Tests that a filesystem without reflink support still gets a full copy."""
+        source = self._write_source()
+        destination = os.path.join(self.data_dir, "copy.avi")
+
+        FileUtils._copy_blocking(source, destination)
+
+        mock_ioctl.assert_called_once()
+        with open(source, "rb") as src, open(destination, "rb") as dst:
+            self.assertEqual(src.read(), dst.read())
+
+    @patch("api.utils.file_utils.shutil.copy")
+    @patch("api.utils.file_utils.fcntl.ioctl", side_effect=OSError(errno.ENOSPC, "No space left on device"))
+    def test_copy_raises_when_disk_is_full(self, mock_ioctl, mock_copy):
+        """Tests that ENOSPC is raised instead of retried through the slower copy paths."""
+        source = self._write_source()
+
+        with self.assertRaises(OSError) as ctx:
+            FileUtils._copy_blocking(source, os.path.join(self.data_dir, "copy.avi"))
+
+        self.assertEqual(ctx.exception.errno, errno.ENOSPC)
+        mock_copy.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
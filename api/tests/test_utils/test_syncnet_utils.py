@@ -10,14 +10,26 @@ The tests cover the following functionality:
 - Preparing a video for synchronization.
 - Performing iterative synchronization.
 - Finalizing the synchronization process.
+- Caching offsets for re-submitted clips.
+- Encoding the final shift speculatively during the last pass.
 """
+import io
 import os
+import sys
+import shutil
 import asyncio
+import itertools
+import json
+import tempfile
+import threading
 import unittest
 from unittest.mock import patch, MagicMock
 from api.config.settings import DATA_DIR
-from api.utils.syncnet_utils import SyncNetUtils
-from api.types.props import SyncAnalysisResult
+from api.utils import syncnet_utils
+from api.utils.syncnet_utils import SyncNetUtils, SpeculativeShift
+from api.utils.syncnet_server import SyncNetServer, capture_thread_output
+from api.types.props import SyncAnalysisResult, SyncError
+from syncnet_python.shell import run_shell
 
 DUMMY_REF = "00001"
 DUMMY_VIDEO_FILE = "/path/to/example.avi"
@@ -56,7 +68,7 @@ class TestSyncNetUtils(unittest.TestCase):
             return args[0].loop.run_until_complete(f(*args, **kwargs))
         return wrapper
 
-    @patch("api.utils.syncnet_utils.asyncio.create_subprocess_shell")
+    @patch("api.utils.syncnet_utils.asyncio.create_subprocess_exec")
     @async_test
     async def test_run_syncnet_success(self, mock_subprocess):
         """Tests successful execution of the run_syncnet method.
@@ -65,7 +77,7 @@ class TestSyncNetUtils(unittest.TestCase):
         and returns the path to the log file.
 
         Args:
-            mock_subprocess (MagicMock): Mock for asyncio.create_subprocess_shell.
+            mock_subprocess (MagicMock): Mock for asyncio.create_subprocess_exec.
         """
         process_mock = MagicMock()
         communicate_future = asyncio.Future()
@@ -81,74 +93,227 @@ class TestSyncNetUtils(unittest.TestCase):
         result = await SyncNetUtils.run_syncnet(DUMMY_REF)
         self.assertIn("run_00001.log", result, "The returned log file name should contain 'run_00001.log'.")
         mock_subprocess.assert_called_once()
+        self.assertEqual(mock_subprocess.call_args[0][:3], (sys.executable, "-m", "syncnet_python.run_syncnet"),
+                         "SyncNet should be exec'd with this interpreter, without a shell.")
         process_mock.communicate.assert_called_once()
 
-    @patch("api.utils.syncnet_utils.os.path.exists")
-    @patch("api.utils.syncnet_utils.FileUtils.move_file")
-    @patch("api.utils.syncnet_utils.FileUtils.copy_file")
+    @patch("api.utils.syncnet_utils.FileUtils.write_bytes")
+    @patch("api.utils.syncnet_utils.asyncio.create_subprocess_exec")
+    @async_test
+    async def test_run_syncnet_capture(self, mock_subprocess, mock_open):
+        """Tests that run_syncnet with capture=True returns the raw output without writing a log.
+
+        Args:
+            mock_subprocess (MagicMock): Mock for asyncio.create_subprocess_exec.
+            mock_open (MagicMock): Mock for FileUtils.write_bytes.
+        """
+        process_mock = MagicMock()
+        communicate_future = asyncio.Future()
+        communicate_future.set_result((b"AV offset: 3\nConfidence: 5.0\n", None))
+        process_mock.communicate.return_value = communicate_future
+        process_mock.returncode = 0
+
+        async def create_subprocess_coro(*args, **kwargs):
+            return process_mock
+
+        mock_subprocess.side_effect = create_subprocess_coro
+
+        result = await SyncNetUtils.run_syncnet(DUMMY_REF, capture=True)
+        self.assertEqual(result, b"AV offset: 3\nConfidence: 5.0\n",
+                         "Captured output should be returned as bytes.")
+        mock_open.assert_not_called()
+
+    @patch("api.utils.syncnet_utils.asyncio.create_subprocess_exec")
+    @async_test
+    async def test_run_syncnet_round_robins_gpus(self, mock_subprocess):
+        """Tests that spawned SyncNet children are pinned to SYNCNET_GPUS in turn and the server to the first one.
+
+        Args:
+            mock_subprocess (MagicMock): Mock for asyncio.create_subprocess_exec.
+        """
+        process_mock = MagicMock()
+        process_mock.returncode = 0
+
+        async def communicate():
+            return (b"dummy output", None)
+
+        async def create_subprocess_coro(*args, **kwargs):
+            return process_mock
+
+        process_mock.communicate.side_effect = communicate
+        mock_subprocess.side_effect = create_subprocess_coro
+
+        with patch("api.utils.syncnet_utils._gpu_cycle", itertools.cycle(["0", "1"])), \
+             patch("api.utils.syncnet_utils.SYNCNET_GPUS", ["0", "1"]):
+            for _ in range(2):
+                await SyncNetUtils.run_syncnet(DUMMY_REF, capture=True)
+            await SyncNetUtils.start_server()
+            await SyncNetUtils.run_syncnet(DUMMY_REF, capture=True)
+        devices = [call[1]["env"]["CUDA_VISIBLE_DEVICES"] for call in mock_subprocess.call_args_list]
+        self.assertEqual(devices, ["0", "1", "0", "0"],
+                         "Children should cycle through the GPUs, the server should take the first without advancing them.")
+
+    @patch("api.utils.syncnet_utils.asyncio.create_subprocess_exec")
+    @async_test
+    async def test_run_syncnet_via_server(self, mock_subprocess):
+        """Tests that run_syncnet uses a listening SyncNet server instead of spawning a subprocess.
+
+        A SyncNetServer with a stub "syncnet" handler is bound to a temporary socket, so the
+        round trip exercises the real request/response protocol without loading the model.
+
+        Args:
+            mock_subprocess (MagicMock): Mock for asyncio.create_subprocess_exec.
+        """
+        socket_dir = tempfile.mkdtemp()
+        socket_path = os.path.join(socket_dir, "syncnet.sock")
+        server = SyncNetServer(socket_path, "unused.model")
+        server.handlers = {"syncnet": lambda request: print(f"AV offset: 3\nConfidence: 5.0 ({request['reference']})")}
+        serve_task = asyncio.ensure_future(server.serve())
+        try:
+            while not os.path.exists(socket_path):
+                await asyncio.sleep(0.01)
+            with patch("api.utils.syncnet_utils.SYNCNET_SOCKET_PATH", socket_path):
+                result = await SyncNetUtils.run_syncnet(DUMMY_REF, capture=True)
+        finally:
+            serve_task.cancel()
+            shutil.rmtree(socket_dir)
+        self.assertEqual(result, f"AV offset: 3\nConfidence: 5.0 ({DUMMY_REF})\n".encode("utf-8"),
+                         "Output captured by the server should be returned as bytes.")
+        mock_subprocess.assert_not_called()
+
+    def test_server_captures_shell_child_output(self):
+        """Tests that ffmpeg-style children run by the pipeline land in the request's captured output."""
+        buf = io.StringIO()
+        with capture_thread_output(buf):
+            returncode = run_shell("echo progress; echo warning >&2; exit 3")
+        self.assertEqual(returncode, 3)
+        self.assertEqual(buf.getvalue(), "progress\nwarning\n",
+                         "Both output streams of the child should be captured.")
+
+    @async_test
+    async def test_server_handle_without_serve(self):
+        """Tests that handle works on a server whose serve() never ran, e.g. one mounted on another listener."""
+        socket_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, socket_dir, True)
+        socket_path = os.path.join(socket_dir, "syncnet.sock")
+        server = SyncNetServer(socket_path, "unused.model")
+        server.handlers = {"syncnet": lambda request: print("syncnet")}
+
+        listener = await asyncio.start_unix_server(server.handle, path=socket_path)
+        try:
+            with patch("api.utils.syncnet_utils.SYNCNET_SOCKET_PATH", socket_path):
+                result = await SyncNetUtils.request_server({"op": "syncnet"})
+        finally:
+            listener.close()
+            await listener.wait_closed()
+        self.assertEqual(result, (0, b"syncnet\n"))
+
+    @async_test
+    async def test_request_server_falls_back_when_server_dies(self):
+        """Tests that a server closing the connection without a reply, as a crashed one does, means a fallback."""
+        socket_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, socket_dir, True)
+        socket_path = os.path.join(socket_dir, "syncnet.sock")
+
+        async def dies_mid_request(reader, writer):
+            await reader.readline()
+            writer.close()
+
+        server = await asyncio.start_unix_server(dies_mid_request, path=socket_path)
+        try:
+            with patch("api.utils.syncnet_utils.SYNCNET_SOCKET_PATH", socket_path):
+                result = await SyncNetUtils.request_server({"op": "syncnet", "reference": DUMMY_REF})
+        finally:
+            server.close()
+            await server.wait_closed()
+        self.assertIsNone(result, "A failed server request should fall back to a subprocess.")
+
+    @async_test
+    async def test_server_overlaps_different_ops(self):
+        """Tests that a pipeline run and a SyncNet evaluation overlap and keep their output apart."""
+        socket_dir = tempfile.mkdtemp()
+        socket_path = os.path.join(socket_dir, "syncnet.sock")
+        syncnet_started = threading.Event()
+
+        def pipeline(request):
+            print("pipeline")
+            print(f"overlapped={syncnet_started.wait(2)}")
+
+        def syncnet(request):
+            syncnet_started.set()
+            print("syncnet")
+
+        server = SyncNetServer(socket_path, "unused.model")
+        server.handlers = {"pipeline": pipeline, "syncnet": syncnet}
+        serve_task = asyncio.ensure_future(server.serve())
+        try:
+            while not os.path.exists(socket_path):
+                await asyncio.sleep(0.01)
+            with patch("api.utils.syncnet_utils.SYNCNET_SOCKET_PATH", socket_path):
+                pipeline_result, syncnet_result = await asyncio.gather(
+                    SyncNetUtils.request_server({"op": "pipeline"}),
+                    SyncNetUtils.request_server({"op": "syncnet"})
+                )
+        finally:
+            serve_task.cancel()
+            shutil.rmtree(socket_dir)
+        self.assertEqual(pipeline_result, (0, b"pipeline\noverlapped=True\n"))
+        self.assertEqual(syncnet_result, (0, b"syncnet\n"))
+
+    @patch("api.utils.syncnet_utils.FileUtils.link_or_copy")
     @patch("api.utils.syncnet_utils.FileUtils.get_next_directory_number")
     @patch("api.utils.syncnet_utils.DATA_DIR", "/mocked/data/dir")
     @async_test
-    async def test_prepare_video_success(self, mock_get_next_dir, mock_copy, mock_move, mock_exists):
+    async def test_prepare_video_success(self, mock_get_next_dir, mock_link):
         """Tests successful execution of prepare_video with mocked file operations.
 
         This test verifies that prepare_video correctly prepares a video for synchronization
-        by copying, moving, retrieving video/audio properties, and (if needed) re-encoding.
+        by linking or copying it, retrieving video/audio properties, and (if needed) re-encoding.
 
         Args:
             mock_get_next_dir (MagicMock): Mock for FileUtils.get_next_directory_number.
-            mock_copy (MagicMock): Mock for FileUtils.copy_file.
-            mock_move (MagicMock): Mock for FileUtils.move_file.
-            mock_exists (MagicMock): Mock for os.path.exists.
+            mock_link (MagicMock): Mock for FileUtils.link_or_copy.
         """
         mock_get_next_dir.return_value = asyncio.Future()
         mock_get_next_dir.return_value.set_result("1")
         mocked_destination = "/mocked/data/dir/1_example.avi"
-        mock_exists.return_value = True
-        mock_copy.return_value = asyncio.Future()
-        mock_copy.return_value.set_result("/temp/path")
-        mock_move.return_value = asyncio.Future()
-        mock_move.return_value.set_result(mocked_destination)
-        vid_future = asyncio.Future()
-        vid_future.set_result(DUMMY_VID_PROPS)
-        aud_future = asyncio.Future()
-        aud_future.set_result(DUMMY_AUDIO_PROPS)
-
-        with patch("api.utils.syncnet_utils.FFmpegUtils.get_video_properties") as mock_vid, \
-             patch("api.utils.syncnet_utils.FFmpegUtils.get_audio_properties") as mock_aud:
-            mock_vid.return_value = vid_future
-            mock_aud.return_value = aud_future
+        mock_link.return_value = asyncio.Future()
+        mock_link.return_value.set_result(mocked_destination)
+        props_future = asyncio.Future()
+        props_future.set_result((DUMMY_VID_PROPS, DUMMY_AUDIO_PROPS))
+
+        with patch("api.utils.syncnet_utils.FFmpegUtils.get_stream_properties") as mock_props:
+            mock_props.return_value = props_future
             result = await SyncNetUtils.prepare_video(DUMMY_VIDEO_FILE, DUMMY_ORIGINAL_FILENAME)
             self.assertEqual(result[0], mocked_destination,
                              "The AVI file path should match the mocked destination.")
+            mock_link.assert_called_once_with(DUMMY_VIDEO_FILE, mocked_destination)
 
-    @patch("api.utils.syncnet_utils.os.path.exists")
     @async_test
-    async def test_perform_sync_iterations(self, mock_exists):
+    async def test_perform_sync_iterations(self):
         """Tests perform_sync_iterations for iterative synchronization.
 
         This test verifies that perform_sync_iterations correctly iterates until the computed
         offset is zero, aggregating the total shift and updating the corrected file path.
-
-        Args:
-            mock_exists (MagicMock): Mock for os.path.exists.
         """
-        mock_exists.return_value = True
 
         future1 = asyncio.Future()
         future1.set_result(SyncAnalysisResult(best_offset_ms=100, total_confidence=100.0, confidence_mapping={}))
         future2 = asyncio.Future()
         future2.set_result(SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={}))
 
-        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_log") as mock_analyze, \
+        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes") as mock_analyze, \
              patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline") as mock_pipeline, \
              patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet") as mock_syncnet, \
-             patch("api.utils.syncnet_utils.FFmpegUtils.shift_audio") as mock_shift:
+             patch("api.utils.syncnet_utils.FFmpegUtils.shift_audio") as mock_shift, \
+             patch("api.utils.syncnet_utils.FFmpegUtils.get_audio_properties") as mock_audio_props:
             mock_analyze.side_effect = [future1, future2]
+            mock_audio_props.return_value = asyncio.Future()
+            mock_audio_props.return_value.set_result(DUMMY_AUDIO_PROPS)
             mock_pipeline.return_value = asyncio.Future()
             mock_pipeline.return_value.set_result(None)
             mock_syncnet.return_value = asyncio.Future()
-            mock_syncnet.return_value.set_result("dummy.log")
+            mock_syncnet.return_value.set_result(b"dummy output")
             mock_shift.return_value = asyncio.Future()
             mock_shift.return_value.set_result(None)
 
@@ -157,6 +322,117 @@ class TestSyncNetUtils(unittest.TestCase):
                                                                 25.0, 1)
             self.assertEqual(result[0], 100,
                              "The total shift in ms should be 100 after the first iteration.")
+            self.assertEqual(mock_shift.call_args[1].get("audio_codec"), "pcm_s16le",
+                             "Pass files should keep their audio as PCM.")
+
+    @async_test
+    async def test_perform_sync_iterations_removes_stale_pass_files(self):
+        """Tests that each pass file is deleted once the next one has been written."""
+        offsets = iter([100, 40, 0])
+
+        async def analyze(*args, **kwargs):
+            return SyncAnalysisResult(best_offset_ms=next(offsets), total_confidence=1.0, confidence_mapping={})
+
+        async def noop(*args, **kwargs):
+            return None
+
+        async def audio_props(*args, **kwargs):
+            return DUMMY_AUDIO_PROPS
+
+        async def syncnet_output(*args, **kwargs):
+            return b"dummy output"
+
+        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes", side_effect=analyze), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline", side_effect=noop) as mock_pipeline, \
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet", side_effect=syncnet_output), \
+             patch("api.utils.syncnet_utils.FFmpegUtils.shift_audio", side_effect=noop), \
+             patch("api.utils.syncnet_utils.FFmpegUtils.get_audio_properties", side_effect=audio_props), \
+             patch("api.utils.syncnet_utils.FileUtils.cleanup_file", side_effect=noop) as mock_cleanup:
+            result = await SyncNetUtils.perform_sync_iterations(DUMMY_DESTINATION,
+                                                                DUMMY_ORIGINAL_FILENAME,
+                                                                25.0, 1)
+
+        self.assertEqual(result[0], 140)
+        self.assertIn("corrected_iter2_", result[1])
+        removed = [call[0][0] for call in mock_cleanup.call_args_list]
+        self.assertEqual(len(removed), 1, "Only the first pass file should have been removed.")
+        self.assertIn("corrected_iter1_", removed[0])
+        reused = [call[1].get("reuse_ref") for call in mock_pipeline.call_args_list]
+        self.assertEqual(reused, [None, "00001", "00002"], "Later passes should reuse the previous pass's tracks.")
+
+    @async_test
+    async def test_pass_frames_removed_after_every_pipeline_run(self):
+        """Tests that each pipeline run's frames are removed, whether or not a shift follows."""
+        removed = []
+
+        async def remove_tree(dir_path):
+            removed.append(os.path.relpath(dir_path, syncnet_utils.DATA_WORK_DIR))
+
+        async def noop(*args, **kwargs):
+            return None
+
+        async def in_sync(*args, **kwargs):
+            return SyncAnalysisResult(best_offset_ms=0, total_confidence=1.0, confidence_mapping={})
+
+        async def syncnet_output(*args, **kwargs):
+            return b"dummy output"
+
+        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes", side_effect=in_sync), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline", side_effect=noop), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet", side_effect=syncnet_output), \
+             patch("api.utils.syncnet_utils.FileUtils.remove_tree", side_effect=remove_tree), \
+             patch("api.utils.syncnet_utils.ApiUtils.send_websocket_message"):
+            result = await SyncNetUtils.perform_sync_iterations(DUMMY_DESTINATION, DUMMY_ORIGINAL_FILENAME, 25.0, 1)
+            await SyncNetUtils.verify_synchronization(DUMMY_DESTINATION, "00002", 25.0)
+
+        self.assertEqual(result[0], 0, "The clip should have been found in sync on the first pass.")
+        self.assertEqual(removed, [os.path.join("pyframes", "00001"), os.path.join("pyframes", "00002")],
+                         "Frames of an in-sync first pass and of a verification should both be removed.")
+
+    @async_test
+    async def test_synchronize_video_reports_oscillation(self):
+        """Tests that oscillating offsets end the run with their own SyncError, before any final encode or re-check."""
+        offsets = iter([120, -110, 115, 0])
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+
+        async def analyze(*args, **kwargs):
+            return SyncAnalysisResult(best_offset_ms=next(offsets), total_confidence=1.0, confidence_mapping={})
+
+        async def noop(*args, **kwargs):
+            return None
+
+        async def audio_props(*args, **kwargs):
+            return DUMMY_AUDIO_PROPS
+
+        async def syncnet_output(*args, **kwargs):
+            return b"dummy output"
+
+        async def content_key(*args, **kwargs):
+            return "oscillating_clip"
+
+        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes", side_effect=analyze), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline", side_effect=noop) as mock_pipeline, \
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet", side_effect=syncnet_output), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.content_key", side_effect=content_key), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.lookup_offset", side_effect=noop), \
+             patch("api.utils.syncnet_utils.SyncNetUtils.remember_offset", side_effect=noop) as mock_remember, \
+             patch("api.utils.syncnet_utils.SyncNetUtils.write_final_shift", side_effect=noop) as mock_write, \
+             patch("api.utils.syncnet_utils.FFmpegUtils.shift_audio", side_effect=noop), \
+             patch("api.utils.syncnet_utils.FFmpegUtils.get_audio_properties", side_effect=audio_props), \
+             patch("api.utils.syncnet_utils.FileUtils.cleanup_file", side_effect=noop):
+            result = await SyncNetUtils._synchronize_video(
+                DUMMY_DESTINATION, DUMMY_VIDEO_FILE, DUMMY_ORIGINAL_FILENAME, DUMMY_VID_PROPS,
+                DUMMY_AUDIO_PROPS, 25.0, DUMMY_DESTINATION, 1, scratch_dir=work_dir
+            )
+
+        self.assertIsInstance(result, SyncError)
+        self.assertIn("flipping between passes", result.message)
+        self.assertIn("120 ms", result.message, "The closest total tried should be reported.")
+        self.assertEqual(result.final_offset, -110, "The smallest offset measured should be reported.")
+        self.assertEqual(mock_pipeline.call_count, 3, "No verification pass should run after the third pass.")
+        mock_write.assert_not_called()
+        mock_remember.assert_not_called()
 
     @patch("api.utils.syncnet_utils.os.remove")
     @patch("api.utils.syncnet_utils.FFmpegUtils.apply_cumulative_shift")
@@ -174,14 +450,15 @@ class TestSyncNetUtils(unittest.TestCase):
         analyze_future = asyncio.Future()
         analyze_future.set_result(SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={}))
 
-        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_log") as mock_analyze, \
+        with patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes") as mock_analyze, \
              patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline") as mock_pipeline, \
-             patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet") as mock_syncnet:
+             patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet") as mock_syncnet, \
+             patch("api.utils.syncnet_utils.SyncNetUtils.start_verification") as mock_background:
             mock_analyze.return_value = analyze_future
             mock_pipeline.return_value = asyncio.Future()
             mock_pipeline.return_value.set_result(None)
             mock_syncnet.return_value = asyncio.Future()
-            mock_syncnet.return_value.set_result("dummy.log")
+            mock_syncnet.return_value.set_result(b"dummy output")
             mock_shift.return_value = asyncio.Future()
             mock_shift.return_value.set_result(None)
 
@@ -196,6 +473,259 @@ class TestSyncNetUtils(unittest.TestCase):
                                                        DUMMY_DESTINATION)
             self.assertIn("corrected", result,
                           "The final output path should contain 'corrected' indicating a successful sync.")
+            mock_background.assert_not_called()
+
+    @patch("api.utils.syncnet_utils.FFmpegUtils.apply_cumulative_shift")
+    @async_test
+    async def test_finalize_sync_converged_skips_recheck(self, mock_shift):
+        """Tests that a converged run defers the SyncNet re-check to the background unless STRICT_VERIFY is set.
+
+        Args:
+            mock_shift (MagicMock): Mock for FFmpegUtils.apply_cumulative_shift.
+        """
+        async def noop(*args, **kwargs):
+            return None
+
+        async def in_sync(*args, **kwargs):
+            return SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={})
+
+        mock_shift.side_effect = noop
+        for strict in (False, True):
+            with patch("api.utils.syncnet_utils.STRICT_VERIFY", strict), \
+                 patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes", side_effect=in_sync), \
+                 patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline", side_effect=noop) as mock_pipeline, \
+                 patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet", side_effect=noop), \
+                 patch("api.utils.syncnet_utils.SyncNetUtils.start_verification") as mock_background:
+                result = await SyncNetUtils.finalize_sync(DUMMY_VIDEO_FILE,
+                                                           DUMMY_ORIGINAL_FILENAME,
+                                                           100,
+                                                           1,
+                                                           25.0,
+                                                           DUMMY_DESTINATION,
+                                                           DUMMY_VID_PROPS,
+                                                           DUMMY_AUDIO_PROPS,
+                                                           DUMMY_DESTINATION,
+                                                           converged=True)
+                self.assertIn("corrected", result)
+                self.assertEqual(mock_pipeline.called, strict,
+                                 "The re-check should only run when STRICT_VERIFY is set.")
+                self.assertEqual(mock_background.called, not strict,
+                                 "A skipped re-check should be run in the background instead, exactly once.")
+
+    @async_test
+    async def test_cancel_verifications(self):
+        """Tests that background verifications still running are cancelled and released on shutdown."""
+        async def never_finishes(*args, **kwargs):
+            await asyncio.Event().wait()
+
+        with patch("api.utils.syncnet_utils.SyncNetUtils.verify_synchronization", side_effect=never_finishes):
+            task = SyncNetUtils.start_verification(DUMMY_VIDEO_FILE, DUMMY_REF, 25.0)
+            await asyncio.sleep(0)
+            await SyncNetUtils.cancel_verifications()
+        self.assertTrue(task.cancelled())
+        self.assertNotIn(task, syncnet_utils._background_tasks)
+
+    @patch("api.utils.syncnet_utils.SyncNetUtils.start_verification")
+    @patch("api.utils.syncnet_utils.FFmpegUtils.apply_cumulative_shift")
+    @patch("api.utils.syncnet_utils.FileUtils.link_or_copy")
+    @async_test
+    async def test_finalize_sync_zero_shift_links_input(self, mock_link, mock_shift, mock_background):
+        """Tests that a zero cumulative shift reuses the input instead of running ffmpeg.
+
+        Args:
+            mock_link (MagicMock): Mock for FileUtils.link_or_copy.
+            mock_shift (MagicMock): Mock for FFmpegUtils.apply_cumulative_shift.
+            mock_background (MagicMock): Mock for SyncNetUtils.start_verification.
+        """
+        async def linked(source, destination):
+            return destination
+
+        mock_link.side_effect = linked
+        result = await SyncNetUtils.finalize_sync(DUMMY_VIDEO_FILE,
+                                                   DUMMY_ORIGINAL_FILENAME,
+                                                   0,
+                                                   1,
+                                                   25.0,
+                                                   DUMMY_DESTINATION,
+                                                   DUMMY_VID_PROPS,
+                                                   DUMMY_AUDIO_PROPS,
+                                                   DUMMY_DESTINATION,
+                                                   converged=True)
+        mock_link.assert_called_once_with(DUMMY_VIDEO_FILE, result)
+        mock_shift.assert_not_called()
+
+    @async_test
+    async def test_make_scratch_dir_falls_back_without_tmpfs(self):
+        """Tests that pass files go under INTERMEDIATE_DIR when SHM_SCRATCH_DIR is not on a mount."""
+        base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base, True)
+        source = os.path.join(base, "source.avi")
+        with open(source, "wb") as f:
+            f.write(b"0" * 1024)
+
+        with patch("api.utils.syncnet_utils.SHM_SCRATCH_DIR", os.path.join(base, "no_mount", "sync-api")), \
+             patch("api.utils.syncnet_utils.INTERMEDIATE_DIR", base):
+            scratch_dir = await SyncNetUtils.make_scratch_dir(7, source)
+
+        self.assertEqual(scratch_dir, os.path.join(base, "00007"))
+        self.assertTrue(os.path.isdir(scratch_dir))
+
+    def test_check_duration(self):
+        """Tests that clips shorter than MIN_SYNC_DURATION_S are rejected and unknown durations pass."""
+        with patch("api.utils.syncnet_utils.MIN_SYNC_DURATION_S", 4.0):
+            SyncNetUtils.check_duration({"duration": 10.0}, {"duration": 9.5})
+            SyncNetUtils.check_duration({"duration": None}, {})
+            with self.assertRaises(RuntimeError) as ctx:
+                SyncNetUtils.check_duration({"duration": 10.0}, {"duration": 2.5})
+        self.assertIn("too short", str(ctx.exception))
+
+    @async_test
+    async def test_offset_cache_round_trip(self):
+        """Tests that offsets are keyed by content, evicted LRU-first and reloaded from disk."""
+        base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base, True)
+        clip = os.path.join(base, "clip.avi")
+        copy = os.path.join(base, "copy.avi")
+        other = os.path.join(base, "other.avi")
+        for path, payload in ((clip, b"a" * 3000000), (copy, b"a" * 3000000), (other, b"b" * 3000000)):
+            with open(path, "wb") as f:
+                f.write(payload)
+
+        clip_key = await SyncNetUtils.content_key(clip)
+        self.assertEqual(clip_key, await SyncNetUtils.content_key(copy))
+        self.assertNotEqual(clip_key, await SyncNetUtils.content_key(other))
+
+        cache_path = os.path.join(base, "offset_cache.json")
+        with patch.object(syncnet_utils, "OFFSET_CACHE_PATH", cache_path), \
+             patch.object(syncnet_utils, "OFFSET_CACHE_SIZE", 2), \
+             patch.object(syncnet_utils, "_offset_cache", syncnet_utils.OrderedDict()), \
+             patch.object(syncnet_utils, "_offset_cache_stamp", None):
+            self.assertIsNone(await SyncNetUtils.lookup_offset(clip_key))
+            await SyncNetUtils.remember_offset(clip_key, 120)
+            await SyncNetUtils.remember_offset("k2", 0)
+            await SyncNetUtils.remember_offset("k3", -40)
+            await SyncNetUtils.flush_writes()
+            self.assertIsNone(await SyncNetUtils.lookup_offset(clip_key), "Oldest entry should be evicted.")
+
+            syncnet_utils._offset_cache.clear()
+            syncnet_utils._offset_cache_stamp = None
+            self.assertEqual(await SyncNetUtils.lookup_offset("k3"), -40, "Cache should reload from disk.")
+            self.assertEqual(await SyncNetUtils.lookup_offset("k2"), 0)
+
+            # Another worker swaps in a file holding its own entry, as _persist_offset_blocking does.
+            with open(cache_path + ".other.tmp", "w") as f:
+                json.dump([["k3", -40], ["other_worker", 80]], f)
+            os.replace(cache_path + ".other.tmp", cache_path)
+            self.assertEqual(await SyncNetUtils.lookup_offset("other_worker"), 80,
+                             "Entries other workers persist should be picked up once the file changes.")
+
+    @async_test
+    async def test_offset_remembered_only_once_verified(self):
+        """Tests that a total is only handed to on_verified after the written file measures in sync."""
+        async def noop(*args, **kwargs):
+            return None
+
+        for measured, strict in ((0, False), (40, False), (0, True), (40, True)):
+            remembered = []
+
+            async def remember():
+                remembered.append(100)
+
+            async def analyze(*args, **kwargs):
+                return SyncAnalysisResult(best_offset_ms=measured, total_confidence=1.0, confidence_mapping={})
+
+            with patch("api.utils.syncnet_utils.STRICT_VERIFY", strict), \
+                 patch("api.utils.syncnet_utils.FFmpegUtils.apply_cumulative_shift", side_effect=noop), \
+                 patch("api.utils.syncnet_utils.AnalysisUtils.analyze_syncnet_bytes", side_effect=analyze), \
+                 patch("api.utils.syncnet_utils.SyncNetUtils.run_pipeline", side_effect=noop), \
+                 patch("api.utils.syncnet_utils.SyncNetUtils.run_syncnet", side_effect=noop):
+                result = await SyncNetUtils.finalize_sync(DUMMY_VIDEO_FILE,
+                                                           DUMMY_ORIGINAL_FILENAME,
+                                                           100,
+                                                           1,
+                                                           25.0,
+                                                           DUMMY_DESTINATION,
+                                                           DUMMY_VID_PROPS,
+                                                           DUMMY_AUDIO_PROPS,
+                                                           DUMMY_DESTINATION,
+                                                           converged=True,
+                                                           on_verified=remember)
+                await asyncio.gather(*syncnet_utils._background_tasks)
+            self.assertEqual(remembered, [100] if measured == 0 else [],
+                             f"measured={measured}, strict={strict}: only a verified total should be cached.")
+            self.assertEqual(isinstance(result, str), measured == 0 or not strict)
+
+    @async_test
+    async def test_remember_offset_concurrent_updates_are_kept(self):
+        """Tests that concurrent remember_offset calls, and entries written by another worker, all persist."""
+        base = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base, True)
+        cache_path = os.path.join(base, "offset_cache.json")
+        with open(cache_path, "w") as f:
+            f.write('[["other_worker", 80]]')
+
+        with patch.object(syncnet_utils, "OFFSET_CACHE_PATH", cache_path), \
+             patch.object(syncnet_utils, "_offset_cache", syncnet_utils.OrderedDict()):
+            await asyncio.gather(
+                SyncNetUtils.remember_offset("k1", 120),
+                SyncNetUtils.remember_offset("k2", -40)
+            )
+
+        with open(cache_path) as f:
+            self.assertEqual(dict(json.load(f)), {"other_worker": 80, "k1": 120, "k2": -40})
+        self.assertEqual(sorted(os.listdir(base)), ["offset_cache.json", "offset_cache.json.lock"],
+                         "No temporary file should be left behind.")
+
+    @async_test
+    async def test_speculative_shift_keeps_only_matching_total(self):
+        """Tests that a new total cancels and removes the earlier encode and only a matching total is handed over."""
+        work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        started = []
+
+        async def fake_write(input_file, output_path, total_shift_ms, vid_props, audio_props):
+            started.append(total_shift_ms)
+            with open(output_path, "wb") as f:
+                f.write(b"partial")
+            if total_shift_ms == 80:
+                await asyncio.sleep(10)
+
+        with patch.object(SyncNetUtils, "write_final_shift", side_effect=fake_write), \
+             patch("api.utils.syncnet_utils.INTERMEDIATE_DIR", work_dir):
+            speculative = SpeculativeShift(DUMMY_VIDEO_FILE, "clip.mp4", DUMMY_VID_PROPS, DUMMY_AUDIO_PROPS, 7)
+            await speculative.start(80)
+            await asyncio.sleep(0)
+            slow_task = speculative.task
+            await speculative.start(120)
+
+            self.assertTrue(slow_task.cancelled())
+            self.assertIsNone(await speculative.take(160), "A different total should not be reused.")
+            await speculative.start(120)
+            self.assertEqual(await speculative.take(120), os.path.join(work_dir, "00007_speculative_120.mp4"))
+
+        self.assertEqual(started, [80, 120], "The encode discarded before it ran should never start.")
+        self.assertEqual(os.listdir(work_dir), ["00007_speculative_120.mp4"],
+                         "Discarded encodes should leave no partial output behind.")
+
+    @async_test
+    async def test_write_final_shift_remuxes_then_falls_back(self):
+        """Tests that MP4 uploads are shifted by remuxing and re-encoded only if the remux fails."""
+        async def noop(*args, **kwargs):
+            return None
+
+        async def remux_fails(*args, **kwargs):
+            raise RuntimeError("no edit lists here")
+
+        with patch("api.utils.syncnet_utils.FFmpegUtils.apply_shift_by_remux", side_effect=noop) as mock_remux, \
+             patch("api.utils.syncnet_utils.FFmpegUtils.apply_shift_and_restore", side_effect=noop) as mock_restore:
+            await SyncNetUtils.write_final_shift("/in.mp4", "/out.mp4", -80, DUMMY_VID_PROPS, DUMMY_AUDIO_PROPS)
+        mock_remux.assert_called_once_with("/in.mp4", "/out.mp4", -80)
+        mock_restore.assert_not_called()
+
+        with patch("api.utils.syncnet_utils.FFmpegUtils.apply_shift_by_remux", side_effect=remux_fails), \
+             patch("api.utils.syncnet_utils.FFmpegUtils.apply_shift_and_restore", side_effect=noop) as mock_restore:
+            await SyncNetUtils.write_final_shift("/in.mp4", "/out.mp4", -80, DUMMY_VID_PROPS, DUMMY_AUDIO_PROPS)
+        mock_restore.assert_called_once()
 
 if __name__ == "__main__":
     unittest.main()
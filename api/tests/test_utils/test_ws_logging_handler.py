@@ -0,0 +1,84 @@
+"""
+Tests for the WebSocketLogHandler.
+
+The tests cover the following functionality:
+- Broadcasting records logged on the event loop.
+- Handing records logged from another thread to the event loop.
+- Dropping records when no event loop is running.
+"""
+import asyncio
+import logging
+import threading
+import unittest
+from unittest.mock import patch
+from api.utils.ws_logging_handler import WebSocketLogHandler
+
+
+class TestWebSocketLogHandler(unittest.TestCase):
+    """Test suite for the WebSocketLogHandler class."""
+
+    def setUp(self):
+        """Set up a fresh event loop and a logger that only uses the handler under test."""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.handler = WebSocketLogHandler()
+        self.logger = logging.getLogger("test_ws_logging_handler")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        """Detach the handler and close the event loop created for the test."""
+        self.logger.removeHandler(self.handler)
+        self.loop.close()
+
+    @patch("api.utils.ws_logging_handler.broadcast_batch")
+    def test_emit_on_loop(self, mock_broadcast):
+        """Tests that a record logged on the event loop is broadcast."""
+        sent = []
+
+        async def fake_broadcast(messages):
+            sent.extend(messages)
+
+        mock_broadcast.side_effect = fake_broadcast
+
+        async def log_and_settle():
+            self.logger.info("on the loop")
+            await asyncio.sleep(0)
+
+        self.loop.run_until_complete(log_and_settle())
+        self.assertEqual(sent, ["on the loop"])
+
+    @patch("api.utils.ws_logging_handler.broadcast_batch")
+    def test_emit_from_worker_thread(self, mock_broadcast):
+        """Tests that a record logged from a thread without a loop reaches the main loop."""
+        received = asyncio.Event()
+        sent = []
+
+        async def fake_broadcast(messages):
+            sent.extend(messages)
+            received.set()
+
+        mock_broadcast.side_effect = fake_broadcast
+        self.handler.loop = self.loop
+
+        async def log_from_thread():
+            thread = threading.Thread(target=self.logger.info, args=("from a thread",))
+            thread.start()
+            await asyncio.wait_for(received.wait(), 1)
+            thread.join()
+
+        self.loop.run_until_complete(log_from_thread())
+        self.assertEqual(sent, ["from a thread"])
+
+    @patch("api.utils.ws_logging_handler.broadcast_batch")
+    def test_emit_without_loop_is_dropped(self, mock_broadcast):
+        """Tests that a record is dropped, without raising, when no loop is running."""
+        with patch.object(self.handler, "handleError") as mock_handle_error:
+            self.logger.info("nobody is listening")
+        mock_broadcast.assert_not_called()
+        mock_handle_error.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,11 +13,13 @@ class VideoProps(BaseModel):
     codec_name: str
     avg_frame_rate: str
     fps: float
+    duration: Union[float, None] = None
 
 class AudioProps(BaseModel):
     sample_rate: Union[str, None] = None
     channels: Union[int, None] = None
     codec_name: Union[str, None] = None
+    duration: Union[float, None] = None
 
 class SyncError(BaseModel):
     error: bool
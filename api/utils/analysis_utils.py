@@ -6,6 +6,7 @@ import re
 import logging
 import asyncio
 from typing import List, Tuple, Dict, Union
+import numpy as np
 from api.utils.file_utils import FileUtils
 from api.types.props import SyncAnalysisResult
 from collections import defaultdict
@@ -13,6 +14,8 @@ from api.utils.api_utils import ApiUtils
 
 logger: logging.Logger = logging.getLogger('analysis_logger')
 
+OFFSET_CONFIDENCE_PATTERN = re.compile(r'AV offset:\s*(-?\d+).*?Confidence:\s*([\d.]+)', re.DOTALL)
+
 class AnalysisUtils:
     """Provides static methods for asynchronous log analysis using a hybrid async/threaded approach.
     
@@ -52,14 +55,44 @@ class AnalysisUtils:
             if not log_content:
                 logger.warning(f"Empty log file: {log_filename}")
                 return SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={})
-            
-            pairs = await ApiUtils.run_blocking(AnalysisUtils.extract_offset_confidence_pairs, log_content)
-            if not pairs:
-                logger.warning("No offset/confidence pairs found")
-                return SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={})
-            
-            confidence_map = await ApiUtils.run_blocking(AnalysisUtils.aggregate_confidence, pairs)
+            return await AnalysisUtils.analyze_syncnet_text(log_content, fps)
+        except Exception as e:
+            logger.error(f"Analysis failed: {str(e)}")
+            return SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={})
+
+    @staticmethod
+    async def analyze_syncnet_bytes(buf: bytes, fps: Union[int, float]) -> SyncAnalysisResult:
+        """Analyzes SyncNet output captured in memory, without a log file round trip.
+
+        Args:
+            buf: Raw stdout bytes captured from the SyncNet subprocess
+            fps: Video frames per second for milliseconds conversion
+
+        Returns:
+            SyncAnalysisResult: Same result as analyze_syncnet_log would produce for
+                                a log file holding these bytes.
+        """
+        logger.debug(f"Analyzing {len(buf)} bytes of SyncNet output")
+        if not buf:
+            logger.warning("Empty SyncNet output")
+            return SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={})
+        return await AnalysisUtils.analyze_syncnet_text(buf.decode("utf-8", "ignore"), fps)
+
+    @staticmethod
+    async def analyze_syncnet_text(log_content: str, fps: Union[int, float]) -> SyncAnalysisResult:
+        """Runs the extraction/aggregation steps of the analysis on already-loaded log text.
+
+        Args:
+            log_content: SyncNet log text
+            fps: Video frames per second for milliseconds conversion
+
+        Returns:
+            SyncAnalysisResult: The best offset in milliseconds, total confidence and offset mapping.
+        """
+        try:
+            confidence_map = await ApiUtils.run_blocking(AnalysisUtils.aggregate_log_confidence, log_content)
             if not confidence_map:
+                logger.warning("No offset/confidence pairs found")
                 return SyncAnalysisResult(best_offset_ms=0, total_confidence=0.0, confidence_mapping={})
             
             best_offset = max(confidence_map, key=confidence_map.get)
@@ -96,8 +129,7 @@ class AnalysisUtils:
                 [(-2, 5.43), (3, 7.21), ...]
         """
         pairs = []
-        pattern = r'AV offset:\s*(-?\d+).*?Confidence:\s*([\d.]+)'
-        matches = re.findall(pattern, log_text, re.DOTALL)
+        matches = OFFSET_CONFIDENCE_PATTERN.findall(log_text)
         for offset_str, confidence_str in matches:
             try:
                 offset = int(offset_str)
@@ -136,6 +168,39 @@ class AnalysisUtils:
             confidence_map[offset] += confidence
         return confidence_map
 
+    @staticmethod
+    def aggregate_log_confidence(log_text: str) -> Dict[int, float]:
+        """Extracts and aggregates offset/confidence pairs from log text in one vectorized pass.
+
+        Equivalent to aggregate_confidence(extract_offset_confidence_pairs(log_text)), including
+        the dictionary order (first occurrence of each offset), so ties in max() resolve the same way.
+        Falls back to the per-pair path if any confidence value fails to parse.
+
+        Args:
+            log_text: Raw text content from SyncNet log file
+
+        Returns:
+            Dict[int, float]: Dictionary mapping offsets to total confidence.
+        """
+        matches = OFFSET_CONFIDENCE_PATTERN.findall(log_text)
+        if not matches:
+            return {}
+        offset_strs, confidence_strs = zip(*matches)
+        try:
+            offsets = np.array(offset_strs, dtype=np.int64)
+            confidences = np.array(confidence_strs, dtype=np.float64)
+        except ValueError:
+            logger.debug("Unparseable pair in log, falling back to per-pair aggregation")
+            return AnalysisUtils.aggregate_confidence(AnalysisUtils.extract_offset_confidence_pairs(log_text))
+        keep = confidences >= 0
+        offsets, confidences = offsets[keep], confidences[keep]
+        if offsets.size == 0:
+            return {}
+        unique, first_index, inverse = np.unique(offsets, return_index=True, return_inverse=True)
+        sums = np.bincount(inverse, weights=confidences)
+        order = np.argsort(first_index, kind="stable")
+        return {int(unique[i]): float(sums[i]) for i in order}
+
     @staticmethod
     def convert_frames_to_ms(frames: int, fps: Union[int, float]) -> int:
         """Converts frame offset to milliseconds using video FPS."""
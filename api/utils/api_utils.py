@@ -7,8 +7,10 @@ import shutil
 import uuid
 import logging
 import asyncio
+import functools
+from typing import Any, Dict, List, Optional, Tuple, Union
 from fastapi import UploadFile
-from api.connection_manager import broadcast
+from api.connection_manager import active_connections, broadcast_batch
 from api.utils.log_utils import LogUtils
 from api.config.settings import TEMP_PROCESSING_DIR
 
@@ -16,12 +18,85 @@ LogUtils.configure_logging()
 logger: logging.Logger = logging.getLogger("api_utils_logger")
 import aiofiles
 
+WS_BATCH_MAX = 16
+WS_BATCH_WINDOW_S = 0.01
+WS_QUEUE_MAX = 64
+
+_ws_queue: Optional[asyncio.Queue] = None
+_ws_queue_loop: Optional[asyncio.AbstractEventLoop] = None
+_ws_drain_task: Optional[asyncio.Task] = None
+
+
+async def _ws_drain(queue: asyncio.Queue) -> None:
+    """
+    Drains queued WebSocket messages, coalescing up to WS_BATCH_MAX messages
+    that arrive within WS_BATCH_WINDOW_S into a single broadcast. Exits once
+    the queue is empty; the next enqueued message starts a new drain.
+
+    Args:
+        queue (asyncio.Queue): The queue of pending messages for this event loop.
+    """
+    loop = asyncio.get_running_loop()
+    while not queue.empty():
+        batch: List[Union[str, Dict[str, Any]]] = [queue.get_nowait()]
+        deadline = loop.time() + WS_BATCH_WINDOW_S
+        while len(batch) < WS_BATCH_MAX:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Progress updates are the dicts in the batch; only the newest one per stage is sent.
+        latest = {m["progress"]["stage"]: m for m in batch if isinstance(m, dict)}
+        batch = [m for m in batch if not isinstance(m, dict) or latest[m["progress"]["stage"]] is m]
+        await broadcast_batch(batch)
+
+
 class ApiUtils:
 
     @staticmethod
     async def run_blocking(func, *args, **kwargs):
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, func, *args, **kwargs)
+        if kwargs:
+            func = functools.partial(func, **kwargs)
+        return await loop.run_in_executor(None, func, *args)
+
+    @staticmethod
+    async def communicate(
+        process: asyncio.subprocess.Process, timeout: float, label: str
+    ) -> Tuple[Optional[bytes], Optional[bytes]]:
+        """
+        Waits up to timeout seconds for a child process and returns its output.
+
+        The child is killed and reaped if it runs over or if the waiting task is
+        cancelled, so a hung ffmpeg or SyncNet run never outlives its sync job.
+
+        Args:
+            process (asyncio.subprocess.Process): The running child.
+            timeout (float): Seconds to wait, e.g. FFMPEG_TIMEOUT_S or SYNCNET_TIMEOUT_S.
+            label (str): What the child is doing, for the timeout error.
+
+        Returns:
+            Tuple[Optional[bytes], Optional[bytes]]: The child's stdout and stderr, None for streams not piped.
+
+        Raises:
+            RuntimeError: If the child did not finish within timeout.
+        """
+        try:
+            return await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            error_msg = f"{label} (pid {process.pid}) timed out after {timeout}s"
+            logger.error(f"[communicate] {error_msg}")
+            raise RuntimeError(error_msg)
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
 
     @staticmethod
     async def save_temp_file(uploaded_file: UploadFile) -> str:
@@ -49,23 +124,75 @@ class ApiUtils:
             raise
 
     @staticmethod
-    def send_websocket_message(message: str) -> None:
+    def has_listeners() -> bool:
+        """
+        Checks whether any WebSocket client is connected.
+
+        Returns:
+            bool: True if at least one connection would receive a message.
+        """
+        return bool(active_connections)
+
+    @staticmethod
+    def update_progress(iteration: int, stage: str, message: str, **fields: Any) -> None:
+        """
+        Sends a structured progress update for a sync pass.
+
+        The update is queued as a dict of the form {"progress": {...}} and serialised
+        once, with the rest of its batch, so it reaches clients as an object. When several
+        updates for the same stage land in the same WebSocket batch only the newest is
+        sent, since it supersedes the others; updates for different stages, such as a
+        pass's measured offset and the shift that follows it, are all kept. Nothing is
+        formatted or queued if no client is connected.
+
+        Args:
+            iteration (int): The current pass number.
+            stage (str): The stage the pass has reached.
+            message (str): A human-readable description of the stage. It is a template
+                filled with str.format_map from iteration, stage and the extra fields.
+            **fields (Any): Extra JSON-serialisable fields, such as total_shift_ms.
+        """
+        if not ApiUtils.has_listeners():
+            return
+        progress = {"iteration": iteration, "stage": stage, **fields}
+        progress["message"] = message.format_map(progress)
+        ApiUtils.send_websocket_message({"progress": progress})
+
+    @staticmethod
+    def send_websocket_message(message: Union[str, Dict[str, Any]]) -> None:
         """
         Broadcasts a message to connected WebSocket clients.
 
+        Every message goes out inside a {"messages": [...]} frame. Inside a running
+        event loop the message is queued and sent by a drain task that batches
+        messages posted close together into one frame. The queue
+        holds at most WS_QUEUE_MAX messages; when a slow client lets it fill up, the
+        oldest status message is dropped to make room, so the caller never waits.
+
         Args:
-            message (str): The message to send.
+            message (Union[str, Dict[str, Any]]): The message to send: a status string, or a
+                JSON-serialisable dict such as a progress update.
         """
+        global _ws_queue, _ws_queue_loop, _ws_drain_task
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
             loop = None
 
         if loop and loop.is_running():
-            loop.create_task(broadcast(message))
+            if _ws_queue is None or _ws_queue_loop is not loop:
+                _ws_queue = asyncio.Queue(maxsize=WS_QUEUE_MAX)
+                _ws_queue_loop = loop
+                _ws_drain_task = None
+            if _ws_queue.full():
+                dropped = _ws_queue.get_nowait()
+                logger.debug("[send_websocket_message] Queue full, dropping oldest message: %.80s", dropped)
+            _ws_queue.put_nowait(message)
+            if _ws_drain_task is None or _ws_drain_task.done():
+                _ws_drain_task = loop.create_task(_ws_drain(_ws_queue))
         else:
             new_loop = asyncio.new_event_loop()
             try:
-                new_loop.run_until_complete(broadcast(message))
+                new_loop.run_until_complete(broadcast_batch([message]))
             finally:
                 new_loop.close()
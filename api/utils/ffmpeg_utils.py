@@ -3,14 +3,26 @@ import json
 import logging
 import shutil
 import asyncio
-from typing import Optional, Dict, List, Union
-from api.config.settings import FINAL_OUTPUT_DIR
+from collections import OrderedDict
+from typing import Optional, Dict, List, Union, Tuple
+from api.config.settings import FFMPEG_THREADS, FFMPEG_TIMEOUT_S
 from api.types.props import VideoProps, AudioProps
 from api.utils.file_utils import FileUtils
 from api.utils.api_utils import ApiUtils
 
 logger: logging.Logger = logging.getLogger("ffmpeg_logger")
 
+# Absolute binary paths plus close_fds=False let subprocess use posix_spawn (Python 3.8+) rather
+# than fork/exec. Python's own descriptors are non-inheritable (PEP 446), so nothing extra leaks.
+FFMPEG_BIN: str = shutil.which("ffmpeg") or "ffmpeg"
+FFPROBE_BIN: str = shutil.which("ffprobe") or "ffprobe"
+PROBE_CACHE_SIZE: int = 128
+AVI_REMUX_VIDEO_CODECS = frozenset({"h264", "mpeg4"})
+AVI_REMUX_AUDIO_CODECS = frozenset({"aac", "pcm_s16le"})
+# Containers that keep a per-stream start offset (edit lists / timestamps) on a stream copy.
+SHIFT_REMUX_CONTAINERS = frozenset({".mp4", ".m4v", ".mov", ".mkv", ".webm"})
+_probe_cache: "OrderedDict[Tuple[str, int, int], Tuple[Optional[VideoProps], Optional[AudioProps]]]" = OrderedDict()
+
 
 class FFmpegUtils:
     """ Utility class for handling various FFmpeg operations asynchronously.
@@ -45,26 +57,80 @@ class FFmpegUtils:
         """
         logger.debug(f"[ENTER] reencode_to_avi -> input_file='{input_file}', output_file='{output_file}'")
         cmd = [
-            "ffmpeg",
+            FFMPEG_BIN,
             "-y",
             "-i", input_file,
             "-vcodec", "mpeg4",
             "-acodec", "pcm_s16le",
             "-strict", "experimental",
+            "-threads", FFMPEG_THREADS,
             output_file
         ]
         proc = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
+            close_fds=False,
+            stdout=asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await proc.communicate()
+        _, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
         if proc.returncode != 0:
             error_msg = stderr.decode("utf-8", "ignore")
             logger.error(f"[reencode_to_avi] FFmpeg error -> {error_msg}")
             raise RuntimeError(f"Failed to re-encode to AVI: {error_msg}")
         logger.debug("[EXIT] reencode_to_avi")
 
+    @staticmethod
+    def can_remux_to_avi(vid_props: Optional[VideoProps], audio_props: Optional[AudioProps]) -> bool:
+        """Tells whether both streams can be copied into an AVI container as-is.
+
+        Args:
+            vid_props (Optional[VideoProps]): Properties of the source video stream.
+            audio_props (Optional[AudioProps]): Properties of the source audio stream.
+
+        Returns:
+            bool: True if the video and audio codecs are ones SyncNet's pipeline reads from AVI.
+        """
+        if not vid_props or not audio_props:
+            return False
+        return (vid_props.get("codec_name") in AVI_REMUX_VIDEO_CODECS
+                and audio_props.get("codec_name") in AVI_REMUX_AUDIO_CODECS)
+
+    @staticmethod
+    async def remux_to_avi(input_file: str, output_file: str, video_codec: Optional[str] = None) -> None:
+        """Copies the streams of a file into an AVI container without re-encoding.
+
+        Args:
+            input_file (str): Path to the source file.
+            output_file (str): Desired path of the AVI file.
+            video_codec (Optional[str]): Source video codec; h264 needs its bitstream
+                converted to Annex B for AVI.
+
+        Raises:
+            RuntimeError: If the ffmpeg command fails with a non-zero exit code.
+        """
+        logger.debug(f"[ENTER] remux_to_avi -> input_file='{input_file}', output_file='{output_file}'")
+        cmd = [
+            FFMPEG_BIN,
+            "-y",
+            "-i", input_file,
+            "-c", "copy"
+        ]
+        if video_codec == "h264":
+            cmd += ["-bsf:v", "h264_mp4toannexb"]
+        cmd += ["-f", "avi", output_file]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            close_fds=False,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
+        if proc.returncode != 0:
+            error_msg = stderr.decode("utf-8", "ignore")
+            logger.error(f"[remux_to_avi] FFmpeg error -> {error_msg}")
+            raise RuntimeError(f"Failed to remux to AVI: {error_msg}")
+        logger.debug("[EXIT] remux_to_avi")
+
     @staticmethod
     async def reencode_to_original_format(
         input_avi_file: str,
@@ -93,19 +159,21 @@ class FFmpegUtils:
         vcodec = original_video_codec if original_video_codec else "copy"
         acodec = original_audio_codec if original_audio_codec else "copy"
         cmd = [
-            "ffmpeg",
+            FFMPEG_BIN,
             "-y",
             "-i", input_avi_file,
             "-vcodec", vcodec,
             "-acodec", acodec,
+            "-threads", FFMPEG_THREADS,
             output_file
         ]
         proc = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
+            close_fds=False,
+            stdout=asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await proc.communicate()
+        _, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
         if proc.returncode != 0:
             error_msg = stderr.decode("utf-8", "ignore")
             logger.error(f"[reencode_to_original_format] FFmpeg error -> {error_msg}")
@@ -115,7 +183,30 @@ class FFmpegUtils:
         logger.debug("[EXIT] reencode_to_original_format")
 
     @staticmethod
-    async def shift_audio(input_file: str, output_file: str, offset_ms: int) -> None:
+    def build_shift_filter(offset_ms: int) -> str:
+        """Builds the audio filter that shifts audio by the given offset.
+
+        Args:
+            offset_ms (int): Millisecond offset to apply. Positive for forward, negative for backward.
+
+        Returns:
+            str: An ffmpeg audio filter string (adelay or atrim, followed by apad).
+        """
+        if offset_ms > 0:
+            logger.info(f"[build_shift_filter] Shifting audio FORWARD by {offset_ms} ms.")
+            return f"adelay={offset_ms}|{offset_ms},apad"
+        shift_abs = abs(offset_ms)
+        logger.info(f"[build_shift_filter] Shifting audio BACKWARD by {shift_abs} ms.")
+        return f"atrim=start={shift_abs / 1000},apad"
+
+    @staticmethod
+    async def shift_audio(
+        input_file: str,
+        output_file: str,
+        offset_ms: int,
+        audio_props: Optional[AudioProps] = None,
+        audio_codec: Optional[str] = None
+    ) -> None:
         """Async audio shifting with FFmpeg.
         
         Async Implementation:
@@ -133,6 +224,10 @@ class FFmpegUtils:
             input_file (str): Path to the source video.
             output_file (str): Desired path of the shifted-output file.
             offset_ms (int): Millisecond offset to apply. Positive for forward, negative for backward.
+            audio_props (Optional[AudioProps]): Audio properties of the input, if already known.
+                Skips the ffprobe call when given.
+            audio_codec (Optional[str]): Codec to encode the shifted audio with. Defaults to
+                the input's audio codec.
 
         Raises:
             RuntimeError: If the ffmpeg operation fails or if the input file is missing.
@@ -140,27 +235,18 @@ class FFmpegUtils:
         logger.debug(
             f"[ENTER] shift_audio -> input_file='{input_file}', output_file='{output_file}', offset_ms={offset_ms}"
         )
-        exists = await ApiUtils.run_blocking(os.path.exists, input_file)
-        if not exists:
-            logger.error(f"[shift_audio] Input file not found -> '{input_file}'")
-            return
-        audio_props = await FFmpegUtils.get_audio_properties(input_file)
+        if audio_props is None:
+            audio_props = await FFmpegUtils.get_audio_properties(input_file)
         logger.debug(f"[shift_audio] audio_props -> {audio_props}")
         if audio_props is None:
             logger.error(f"[shift_audio] No audio props found in '{input_file}'")
-            return
+            raise RuntimeError(f"No audio stream found in {input_file}")
         sample_rate = int(audio_props.get("sample_rate"))
         channels = int(audio_props.get("channels"))
-        codec_name = audio_props.get("codec_name")
-        if offset_ms > 0:
-            filter_complex = f"adelay={offset_ms}|{offset_ms},apad"
-            logger.info(f"[shift_audio] Shifting audio FORWARD by {offset_ms} ms.")
-        else:
-            shift_abs = abs(offset_ms)
-            filter_complex = f"atrim=start={shift_abs / 1000},apad"
-            logger.info(f"[shift_audio] Shifting audio BACKWARD by {shift_abs} ms.")
+        codec_name = audio_codec or audio_props.get("codec_name")
+        filter_complex = FFmpegUtils.build_shift_filter(offset_ms)
         cmd = [
-            "ffmpeg",
+            FFMPEG_BIN,
             "-y",
             "-i", input_file,
             "-c", "copy",
@@ -168,16 +254,17 @@ class FFmpegUtils:
             "-c:a", codec_name,
             "-ar", str(sample_rate),
             "-ac", str(channels),
-            "-threads", "4",
+            "-threads", FFMPEG_THREADS,
             "-shortest",
             output_file
         ]
         proc = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
+            close_fds=False,
+            stdout=asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await proc.communicate()
+        _, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
         if proc.returncode != 0:
             error_msg = stderr.decode("utf-8", "ignore")
             logger.error(f"[shift_audio] FFmpeg error -> {error_msg}")
@@ -186,7 +273,9 @@ class FFmpegUtils:
 
     @staticmethod
     async def apply_cumulative_shift(input_file: str, final_output: str, total_shift_ms: int) -> None:
-        """Copies a file into the final output directory, then applies a global audio shift.
+        """Applies a global audio shift to a file, writing the result to final_output.
+
+        A partly written final_output is removed if the shift fails or is cancelled.
 
         Args:
             input_file (str): Source file to be shifted.
@@ -200,90 +289,163 @@ class FFmpegUtils:
             f"[ENTER] apply_cumulative_shift -> input_file='{input_file}', final_output='{final_output}', "
             f"total_shift_ms={total_shift_ms}"
         )
-        copied_file = os.path.join(FINAL_OUTPUT_DIR, os.path.basename(input_file))
-        await FileUtils.copy_file(input_file, copied_file)
-        logger.debug(f"[apply_cumulative_shift] Copied input -> '{copied_file}'")
+        completed = False
         try:
-            await FFmpegUtils.shift_audio(copied_file, final_output, total_shift_ms)
+            audio_props = await FFmpegUtils.get_audio_properties(input_file)
+            await FFmpegUtils.shift_audio(input_file, final_output, total_shift_ms, audio_props)
+            completed = True
             logger.info(f"[apply_cumulative_shift] Completed shift. final_output='{final_output}'")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"[apply_cumulative_shift] Exception -> {str(e)}")
             raise RuntimeError(f"Could not apply cumulative shift: {e}")
         finally:
-            exists = await ApiUtils.run_blocking(os.path.exists, copied_file)
-            if exists:
-                await FileUtils.cleanup_file(copied_file)
-                logger.debug(f"[apply_cumulative_shift] Removed temp file -> '{copied_file}'")
+            if not completed:
+                await ApiUtils.run_blocking(FileUtils.remove_if_exists, final_output)
+                logger.debug(f"[apply_cumulative_shift] Removed partial output -> '{final_output}'")
         logger.debug("[EXIT] apply_cumulative_shift")
 
     @staticmethod
-    async def get_audio_properties(file_path: str) -> Optional[AudioProps]:
-        """Retrieves audio properties from the given file using ffprobe.
+    async def apply_shift_and_restore(
+        input_file: str,
+        output_file: str,
+        total_shift_ms: int,
+        original_container_ext: str,
+        original_video_codec: Optional[str],
+        original_audio_codec: Optional[str]
+    ) -> None:
+        """Shifts the audio and writes the original container/codecs in a single ffmpeg pass.
+
+        Equivalent to apply_cumulative_shift followed by reencode_to_original_format, without
+        writing and re-reading the intermediate shifted file.
 
         Args:
-            file_path (str): Path to the input media file.
+            input_file (str): Source file to be shifted.
+            output_file (str): Desired path of the restored, shifted video.
+            total_shift_ms (int): Total millisecond offset to shift the audio.
+            original_container_ext (str): File extension of the original container (e.g. '.mp4').
+            original_video_codec (Optional[str]): Original video codec if known.
+            original_audio_codec (Optional[str]): Original audio codec if known.
 
-        Returns:
-            Optional[AudioProps]: A dictionary containing audio information
-            (sample_rate, channels, codec_name), or None if no audio stream is found.
+        Raises:
+            RuntimeError: If the input has no audio stream or the ffmpeg command fails.
+        """
+        logger.debug(
+            f"[ENTER] apply_shift_and_restore -> input_file='{input_file}', output_file='{output_file}', "
+            f"total_shift_ms={total_shift_ms}, original_container_ext='{original_container_ext}', "
+            f"original_video_codec='{original_video_codec}', original_audio_codec='{original_audio_codec}'"
+        )
+        audio_props = await FFmpegUtils.get_audio_properties(input_file)
+        if audio_props is None:
+            logger.error(f"[apply_shift_and_restore] No audio props found in '{input_file}'")
+            raise RuntimeError(f"No audio stream found in {input_file}")
+        vcodec = original_video_codec if original_video_codec else "copy"
+        acodec = original_audio_codec if original_audio_codec else audio_props.get("codec_name")
+        cmd = [
+            FFMPEG_BIN,
+            "-y",
+            "-i", input_file,
+            "-af", FFmpegUtils.build_shift_filter(total_shift_ms),
+            "-vcodec", vcodec,
+            "-acodec", acodec,
+            "-ar", str(int(audio_props.get("sample_rate"))),
+            "-ac", str(int(audio_props.get("channels"))),
+            "-threads", FFMPEG_THREADS,
+            "-shortest",
+            output_file
+        ]
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            close_fds=False,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
+        if proc.returncode != 0:
+            error_msg = stderr.decode("utf-8", "ignore")
+            logger.error(f"[apply_shift_and_restore] FFmpeg error -> {error_msg}")
+            raise RuntimeError(
+                f"Failed to shift and restore to original container {original_container_ext}: {error_msg}"
+            )
+        logger.debug("[EXIT] apply_shift_and_restore")
+
+    @staticmethod
+    async def apply_shift_by_remux(input_file: str, output_file: str, total_shift_ms: int) -> None:
+        """Shifts the audio by moving its timestamps, stream-copying both tracks.
+
+        The input is opened twice: video from the first, audio from the second, which is offset
+        with -itsoffset (delay) or input-seeked with -ss (advance). Nothing is re-encoded, so this
+        only suits containers in SHIFT_REMUX_CONTAINERS. Advancing lands on an audio packet
+        boundary (~20 ms for AAC), well inside SyncNet's one-frame resolution.
+
+        Args:
+            input_file (str): Source file to be shifted.
+            output_file (str): Desired path of the shifted file, in the same container.
+            total_shift_ms (int): Total millisecond offset. Positive delays the audio, negative advances it.
 
         Raises:
-            RuntimeError: If ffprobe fails to execute.
+            RuntimeError: If the ffmpeg command fails.
         """
-        logger.debug(f"[ENTER] get_audio_properties -> file_path='{file_path}'")
+        logger.debug(
+            f"[ENTER] apply_shift_by_remux -> input_file='{input_file}', output_file='{output_file}', "
+            f"total_shift_ms={total_shift_ms}"
+        )
+        seconds = f"{abs(total_shift_ms) / 1000:.3f}"
+        audio_input = ["-itsoffset", seconds] if total_shift_ms > 0 else ["-ss", seconds]
         cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-print_format", "json",
-            "-show_streams",
-            file_path
+            FFMPEG_BIN,
+            "-y",
+            "-i", input_file,
+            *audio_input,
+            "-i", input_file,
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-c", "copy",
+            output_file
         ]
         proc = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
+            close_fds=False,
+            stdout=asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await proc.communicate()
+        _, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
         if proc.returncode != 0:
             error_msg = stderr.decode("utf-8", "ignore")
-            logger.error(f"[get_audio_properties] FFprobe error -> {error_msg}")
-            return None
-        try:
-            metadata = json.loads(stdout.decode("utf-8", "ignore"))
-            streams = metadata.get("streams", [])
-            for stream in streams:
-                if stream.get("codec_type") == "audio":
-                    audio_props: AudioProps = {
-                        "sample_rate": stream.get("sample_rate"),
-                        "channels": stream.get("channels"),
-                        "codec_name": stream.get("codec_name")
-                    }
-                    logger.info(f"[get_audio_properties] Found audio props -> {audio_props}")
-                    logger.debug(f"[EXIT] get_audio_properties -> {audio_props}")
-                    return audio_props
-            logger.error(f"[get_audio_properties] No audio stream found in '{file_path}'")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"[get_audio_properties] JSON parsing error -> {str(e)}")
-            return None
+            logger.error(f"[apply_shift_by_remux] FFmpeg error -> {error_msg}")
+            raise RuntimeError(f"Failed to shift {input_file} by remuxing: {error_msg}")
+        logger.debug("[EXIT] apply_shift_by_remux")
 
     @staticmethod
-    async def get_video_properties(file_path: str) -> Optional[VideoProps]:
-        """Retrieves video properties from the given file using ffprobe.
+    async def get_stream_properties(file_path: str) -> Tuple[Optional[VideoProps], Optional[AudioProps]]:
+        """Retrieves video and audio properties from the given file with a single ffprobe call.
+
+        Results are cached per (path, mtime, size), so probing the same unchanged file
+        again does not spawn another ffprobe process.
 
         Args:
             file_path (str): Path to the input media file.
 
         Returns:
-            Optional[VideoProps]: A dictionary containing video information
-            (codec_name, avg_frame_rate, fps), or None if no video stream is found.
-
-        Raises:
-            RuntimeError: If ffprobe fails to execute.
+            Tuple[Optional[VideoProps], Optional[AudioProps]]: The first video stream and first
+            audio stream found, each None if the file has no such stream or could not be probed.
         """
-        logger.debug(f"[ENTER] get_video_properties -> file_path='{file_path}'")
+        logger.debug(f"[ENTER] get_stream_properties -> file_path='{file_path}'")
+        try:
+            st = await ApiUtils.run_blocking(os.stat, file_path)
+        except OSError as e:
+            logger.error(f"[get_stream_properties] Cannot stat '{file_path}' -> {str(e)}")
+            return None, None
+        key = (file_path, st.st_mtime_ns, st.st_size)
+        cached = _probe_cache.get(key)
+        if cached is not None:
+            _probe_cache.move_to_end(key)
+            logger.debug(f"[EXIT] get_stream_properties -> cache hit {cached}")
+            return cached
+
         cmd = [
-            "ffprobe",
+            FFPROBE_BIN,
             "-v", "quiet",
             "-print_format", "json",
             "-show_streams",
@@ -291,37 +453,105 @@ class FFmpegUtils:
         ]
         proc = await asyncio.create_subprocess_exec(
             *cmd,
+            close_fds=False,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await proc.communicate()
+        stdout, stderr = await ApiUtils.communicate(proc, FFMPEG_TIMEOUT_S, "ffmpeg")
         if proc.returncode != 0:
             error_msg = stderr.decode("utf-8", "ignore")
-            logger.error(f"[get_video_properties] ffprobe error -> {error_msg}")
-            return None
+            logger.error(f"[get_stream_properties] ffprobe error -> {error_msg}")
+            return None, None
         try:
             metadata = json.loads(stdout.decode("utf-8", "ignore"))
-            streams = metadata.get("streams", [])
-            for stream in streams:
-                if stream.get("codec_type") == "video":
-                    avg_frame_rate = stream.get("avg_frame_rate", "0/0")
-                    fps = 0.0
-                    try:
-                        num, den = avg_frame_rate.split("/")
-                        if float(den) != 0:
-                            fps = float(num) / float(den)
-                    except Exception as e:
-                        logger.error(f"[get_video_properties] Error parsing avg_frame_rate='{avg_frame_rate}' -> {str(e)}")
-                    video_props: VideoProps = {
-                        "codec_name": stream.get("codec_name"),
-                        "avg_frame_rate": avg_frame_rate,
-                        "fps": fps
-                    }
-                    logger.info(f"[get_video_properties] Found video props -> {video_props}")
-                    logger.debug(f"[EXIT] get_video_properties -> {video_props}")
-                    return video_props
+        except json.JSONDecodeError as e:
+            logger.error(f"[get_stream_properties] JSON parsing error -> {str(e)}")
+            return None, None
+
+        video_props: Optional[VideoProps] = None
+        audio_props: Optional[AudioProps] = None
+        for stream in metadata.get("streams", []):
+            codec_type = stream.get("codec_type")
+            if codec_type == "video" and video_props is None:
+                video_props = FFmpegUtils._video_props_from_stream(stream)
+            elif codec_type == "audio" and audio_props is None:
+                audio_props = FFmpegUtils._audio_props_from_stream(stream)
+
+        result = (video_props, audio_props)
+        _probe_cache[key] = result
+        if len(_probe_cache) > PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+        logger.info(f"[get_stream_properties] Found props -> video={video_props}, audio={audio_props}")
+        logger.debug(f"[EXIT] get_stream_properties -> {result}")
+        return result
+
+    @staticmethod
+    def _video_props_from_stream(stream: Dict) -> VideoProps:
+        avg_frame_rate = stream.get("avg_frame_rate", "0/0")
+        fps = 0.0
+        try:
+            num, den = avg_frame_rate.split("/")
+            if float(den) != 0:
+                fps = float(num) / float(den)
+        except Exception as e:
+            logger.error(f"[get_video_properties] Error parsing avg_frame_rate='{avg_frame_rate}' -> {str(e)}")
+        return {
+            "codec_name": stream.get("codec_name"),
+            "avg_frame_rate": avg_frame_rate,
+            "fps": fps,
+            "duration": FFmpegUtils._duration_from_stream(stream)
+        }
+
+    @staticmethod
+    def _audio_props_from_stream(stream: Dict) -> AudioProps:
+        return {
+            "sample_rate": stream.get("sample_rate"),
+            "channels": stream.get("channels"),
+            "codec_name": stream.get("codec_name"),
+            "duration": FFmpegUtils._duration_from_stream(stream)
+        }
+
+    @staticmethod
+    def _duration_from_stream(stream: Dict) -> Optional[float]:
+        try:
+            return float(stream["duration"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    @staticmethod
+    async def get_audio_properties(file_path: str) -> Optional[AudioProps]:
+        """Retrieves audio properties from the given file using ffprobe.
+
+        Args:
+            file_path (str): Path to the input media file.
+
+        Returns:
+            Optional[AudioProps]: A dictionary containing audio information
+            (sample_rate, channels, codec_name), or None if no audio stream is found.
+        """
+        logger.debug(f"[ENTER] get_audio_properties -> file_path='{file_path}'")
+        _, audio_props = await FFmpegUtils.get_stream_properties(file_path)
+        if audio_props is None:
+            logger.error(f"[get_audio_properties] No audio stream found in '{file_path}'")
+            return None
+        logger.debug(f"[EXIT] get_audio_properties -> {audio_props}")
+        return audio_props
+
+    @staticmethod
+    async def get_video_properties(file_path: str) -> Optional[VideoProps]:
+        """Retrieves video properties from the given file using ffprobe.
+
+        Args:
+            file_path (str): Path to the input media file.
+
+        Returns:
+            Optional[VideoProps]: A dictionary containing video information
+            (codec_name, avg_frame_rate, fps), or None if no video stream is found.
+        """
+        logger.debug(f"[ENTER] get_video_properties -> file_path='{file_path}'")
+        video_props, _ = await FFmpegUtils.get_stream_properties(file_path)
+        if video_props is None:
             logger.info(f"[get_video_properties] No video stream found in '{file_path}'")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"[get_video_properties] JSON parsing error -> {str(e)}")
-            return None
\ No newline at end of file
+        logger.debug(f"[EXIT] get_video_properties -> {video_props}")
+        return video_props
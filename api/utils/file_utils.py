@@ -1,4 +1,6 @@
 import os
+import errno
+import fcntl
 import shutil
 import logging
 from typing import List, Optional
@@ -8,6 +10,16 @@ from api.utils.api_utils import ApiUtils
 
 logger: logging.Logger = logging.getLogger('file_utils_logger')
 
+# Holds the next free reference number for a directory; shared by every worker process.
+REF_COUNTER_FILE = ".next_ref"
+
+# ioctl request that makes a file share another's extents (Btrfs, XFS with reflink, OCFS2).
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem or kernel cannot do that", so a plainer copy is worth trying.
+# Anything else (ENOSPC, EIO, EACCES, ...) would fail the fallback too and is raised instead.
+COPY_FALLBACK_ERRNOS = frozenset({errno.EXDEV, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL, errno.ENOTTY})
+
 
 class FileUtils:
     @staticmethod
@@ -15,7 +27,7 @@ class FileUtils:
         """Async copy using threadpool for blocking I/O."""
         logger.debug(f"Copying file: {source} -> {destination}")
         try:
-            await ApiUtils.run_blocking(shutil.copy, source, destination)
+            await ApiUtils.run_blocking(FileUtils._copy_blocking, source, destination)
             logger.info(f"Copied file: {source} -> {destination}")
             return destination
         except Exception as e:
@@ -34,6 +46,68 @@ class FileUtils:
             logger.error(f"Failed to move file: {e}")
             raise IOError(f"Could not move file: {e}")
 
+    @staticmethod
+    async def link_or_copy(source: str, destination: str) -> str:
+        """Async hardlink when source and destination share a filesystem, byte copy otherwise."""
+        logger.debug(f"Linking or copying file: {source} -> {destination}")
+        try:
+            linked = await ApiUtils.run_blocking(FileUtils._link_or_copy_blocking, source, destination)
+            logger.info(f"{'Linked' if linked else 'Copied'} file: {source} -> {destination}")
+            return destination
+        except Exception as e:
+            logger.error(f"Failed to link or copy file: {e}")
+            raise IOError(f"Could not link or copy file: {e}")
+
+    @staticmethod
+    def _link_or_copy_blocking(source: str, destination: str) -> bool:
+        dest_dir = os.path.dirname(os.path.abspath(destination))
+        try:
+            os.unlink(destination)
+        except FileNotFoundError:
+            pass
+        if os.stat(source).st_dev == os.stat(dest_dir).st_dev:
+            try:
+                os.link(source, destination)
+                return True
+            except OSError:
+                pass
+        FileUtils._copy_blocking(source, destination)
+        return False
+
+    @staticmethod
+    def _copy_blocking(source: str, destination: str) -> None:
+        """Reflink where the filesystem allows it, else copy through os.copy_file_range or shutil.copy."""
+        if os.path.isdir(destination):
+            destination = os.path.join(destination, os.path.basename(source))
+        if FileUtils._reflink_blocking(source, destination):
+            return
+        if hasattr(os, "copy_file_range"):
+            try:
+                with open(source, "rb") as src, open(destination, "wb") as dst:
+                    while os.copy_file_range(src.fileno(), dst.fileno(), 1 << 30):
+                        pass
+                shutil.copymode(source, destination)
+                return
+            except OSError as e:
+                if e.errno not in COPY_FALLBACK_ERRNOS:
+                    raise
+                logger.debug(f"copy_file_range unavailable ({e}), falling back to shutil.copy")
+        shutil.copy(source, destination)
+
+    @staticmethod
+    def _reflink_blocking(source: str, destination: str) -> bool:
+        """Clone source into destination with FICLONE; False when the filesystem cannot."""
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError as e:
+            if e.errno not in COPY_FALLBACK_ERRNOS:
+                raise
+            logger.debug(f"Reflink unavailable ({e}), copying bytes instead")
+            return False
+        shutil.copymode(source, destination)
+        return True
+
     @staticmethod
     async def read_file(file_path: str) -> str:
         """Async file read using aiofiles."""
@@ -47,6 +121,37 @@ class FileUtils:
             logger.error(f"Failed to read file: {e}")
             raise IOError(f"Could not read file: {e}")
 
+    @staticmethod
+    async def write_bytes(file_path: str, data: bytes) -> str:
+        """Async write of a whole buffer with one threadpool hop for open, write and close."""
+        logger.debug(f"Writing {len(data)} bytes to file: {file_path}")
+        try:
+            await ApiUtils.run_blocking(FileUtils._write_bytes_blocking, file_path, data)
+            logger.debug(f"Successfully wrote file: {file_path}")
+            return file_path
+        except Exception as e:
+            logger.error(f"Failed to write file: {e}")
+            raise IOError(f"Could not write file: {e}")
+
+    @staticmethod
+    def _write_bytes_blocking(file_path: str, data: bytes) -> None:
+        # A raw fd skips the BufferedWriter layer; O_CLOEXEC keeps it out of spawned ffmpeg/SyncNet children.
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def remove_if_exists(file_path: str) -> None:
+        """Blocking removal of a file that may never have been created, such as a partial output."""
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
     @staticmethod
     async def cleanup_file(file_path: str) -> None:
         """Async file deletion using threadpool for blocking I/O."""
@@ -61,13 +166,41 @@ class FileUtils:
             raise IOError(f"Could not remove file: {e}")
 
     @staticmethod
-    async def get_next_directory_number(data_dir: str) -> str:
-        """Async directory number calculation"""
+    async def remove_tree(dir_path: str) -> None:
+        """Async recursive directory removal using threadpool for blocking I/O."""
+        logger.debug(f"Removing directory tree: {dir_path}")
+        await ApiUtils.run_blocking(shutil.rmtree, dir_path, ignore_errors=True)
+
+    @staticmethod
+    async def get_next_directory_number(data_dir: str, reserve: int = 1) -> str:
+        """Async directory number allocation.
+
+        The next free number is kept in REF_COUNTER_FILE inside data_dir and bumped under an
+        exclusive flock, so worker processes sharing data_dir never hand out the same number.
+        The directory is only scanned to seed the counter when the file does not exist yet.
+        reserve numbers are handed out in one block, of which the first is returned.
+        """
+        return await ApiUtils.run_blocking(FileUtils._take_numbers, data_dir, reserve)
+
+    @staticmethod
+    def _take_numbers(data_dir: str, reserve: int) -> str:
+        os.makedirs(data_dir, exist_ok=True)
+        fd = os.open(os.path.join(data_dir, REF_COUNTER_FILE), os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 32).strip()
+            number = int(raw) if raw.isdigit() else FileUtils._scan_next_number(data_dir)
+            # Fixed width, so the counter is overwritten in place by one write and never truncated.
+            os.pwrite(fd, b"%010d" % (number + max(reserve, 1)), 0)
+        finally:
+            os.close(fd)
+        return f"{number:05d}"
+
+    @staticmethod
+    def _scan_next_number(data_dir: str) -> int:
         try:
-            items = await ApiUtils.run_blocking(os.listdir, data_dir)
-            existing_numbers = [int(item) for item in items if item.isdigit()]
-            next_number = max(existing_numbers) + 1 if existing_numbers else 1
-            return f"{next_number:05d}"
+            existing_numbers = [int(item) for item in os.listdir(data_dir) if item.isdigit()]
         except FileNotFoundError:
-            await ApiUtils.run_blocking(os.makedirs, data_dir, exist_ok=True)
-            return "00001"
+            os.makedirs(data_dir, exist_ok=True)
+            return 1
+        return max(existing_numbers) + 1 if existing_numbers else 1
@@ -0,0 +1,216 @@
+"""
+Long-lived SyncNet inference server.
+
+Loads the SyncNet model and the S3FD face detector once and serves pipeline runs and SyncNet
+evaluations over a UNIX domain socket, so a sync pass no longer pays interpreter start-up, the
+torch import, CUDA initialisation and the weight loads on every call.
+
+Protocol:
+    The client sends one JSON line, either
+        {"op": "pipeline", "videofile": "...", "reference": "00002", "reuse_reference": "00001"} or
+        {"op": "syncnet", "data_dir": "...", "reference": "00001"},
+    and reads one JSON object back, {"returncode": int, "output": str}, before the server closes
+    the connection. "reuse_reference" is optional and maps to run_pipeline's --reuse_reference.
+    "output" holds everything the equivalent `python -m syncnet_python.run_pipeline`
+    or `python -m syncnet_python.run_syncnet` call would have printed.
+
+Usage:
+    python -m api.utils.syncnet_server [--socket PATH] [--fp16]
+"""
+
+import io
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import threading
+import contextlib
+import traceback
+from typing import Any, Callable, Dict, Tuple
+
+from api.config.settings import SYNCNET_SOCKET_PATH, SYNCNET_MODEL_PATH, SYNCNET_FP16, DATA_WORK_DIR
+
+logger: logging.Logger = logging.getLogger("syncnet_server_logger")
+
+Request = Dict[str, Any]
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """Stands in for sys.stdout/sys.stderr and sends each thread's writes to its own buffer.
+
+    Threads without a buffer installed write through to the stream that was replaced.
+    """
+
+    def __init__(self, fallback: Any) -> None:
+        self.fallback = fallback
+        self.local = threading.local()
+
+    def target(self) -> Any:
+        return getattr(self.local, "buffer", None) or self.fallback
+
+    def write(self, s: str) -> int:
+        return self.target().write(s)
+
+    def flush(self) -> None:
+        self.target().flush()
+
+
+@contextlib.contextmanager
+def capture_thread_output(buf: io.StringIO):
+    """Captures this thread's writes to sys.stdout and sys.stderr into buf.
+
+    Other threads keep their own output, so concurrent requests each capture only what they print.
+    """
+    if not isinstance(sys.stdout, _ThreadLocalStream):
+        sys.stdout = _ThreadLocalStream(sys.stdout)
+    if not isinstance(sys.stderr, _ThreadLocalStream):
+        sys.stderr = _ThreadLocalStream(sys.stderr)
+    streams = (sys.stdout, sys.stderr)
+    for stream in streams:
+        stream.local.buffer = buf
+    try:
+        yield buf
+    finally:
+        for stream in streams:
+            stream.local.buffer = None
+
+
+class SyncNetServer:
+    """Serves SyncNet requests from a single resident model.
+
+    Requests run on worker threads. Each op has its own lock, so one pipeline run
+    (ffmpeg and face detection) can overlap one SyncNet evaluation for another pass or video,
+    while two requests for the same op never share the detector or the model at once.
+    Output is captured per thread, so overlapping requests do not mix their logs.
+    """
+
+    def __init__(self, socket_path: str, model_path: str, fp16: bool = False) -> None:
+        self.socket_path = socket_path
+        self.model_path = model_path
+        self.fp16 = fp16
+        self.model = None
+        self.detector = None
+        self.handlers: Dict[str, Callable[[Request], None]] = {
+            "pipeline": self._run_pipeline,
+            "syncnet": self._run_syncnet,
+        }
+        # One lock per op, created on first use so it belongs to the loop serving the requests.
+        self.locks: Dict[str, asyncio.Lock] = {}
+
+    def load(self) -> None:
+        """Loads the SyncNet weights and the face detector once for the lifetime of the server.
+
+        On CUDA, cuDNN autotuning is switched on, since every pass feeds the model the same
+        batch shapes, and a warm-up forward pass runs so the first request does not pay for it.
+        """
+        import torch
+        from device_config import get_device
+        from syncnet_python.run_syncnet import load_model
+        from syncnet_python.run_pipeline import load_detector
+        cuda: bool = get_device() == "cuda"
+        if cuda:
+            torch.backends.cudnn.benchmark = True
+        self.model = load_model(self.model_path, self.fp16)
+        logger.info(f"[load] SyncNet model loaded from {self.model_path}")
+        if cuda:
+            self.model.warm_up()
+            logger.info("[load] SyncNet model warmed up")
+        self.detector = load_detector()
+        logger.info("[load] S3FD face detector loaded")
+
+    def _run_pipeline(self, request: Request) -> None:
+        from syncnet_python import run_pipeline
+        opt = run_pipeline.parse_options([
+            "--data_dir", request.get("data_dir", DATA_WORK_DIR),
+            "--videofile", request["videofile"],
+            "--reference", request["reference"],
+            "--reuse_reference", request.get("reuse_reference") or "",
+        ])
+        run_pipeline.main(opt, detector=self.detector)
+
+    def _run_syncnet(self, request: Request) -> None:
+        from syncnet_python import run_syncnet
+        opt = run_syncnet.parse_options([
+            "--initial_model", self.model_path,
+            "--data_dir", request.get("data_dir", DATA_WORK_DIR),
+            "--reference", request["reference"],
+        ])
+        run_syncnet.main(opt, model=self.model)
+
+    def run_request(self, request: Request) -> Tuple[int, str]:
+        """Runs one request, returning its exit code and captured output.
+
+        Args:
+            request (Request): The decoded request.
+
+        Returns:
+            Tuple[int, str]: 0 and the output on success, 1 and the output plus traceback on failure,
+                             2 if the op is unknown.
+        """
+        handler = self.handlers.get(request.get("op"))
+        if handler is None:
+            return 2, f"Unknown op: {request.get('op')}\n"
+        buf = io.StringIO()
+        returncode = 0
+        with capture_thread_output(buf):
+            try:
+                handler(request)
+            except BaseException:
+                traceback.print_exc()
+                returncode = 1
+        return returncode, buf.getvalue()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Handles one client connection carrying a single request."""
+        loop = asyncio.get_running_loop()
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line.decode("utf-8"))
+            except ValueError as e:
+                returncode, output = 2, f"Malformed request: {e}\n"
+            else:
+                logger.debug(f"[handle] Received request: {request}")
+                op = request.get("op")
+                if op not in self.handlers:
+                    returncode, output = self.run_request(request)
+                else:
+                    lock = self.locks.get(op)
+                    if lock is None:
+                        lock = self.locks[op] = asyncio.Lock()
+                    async with lock:
+                        returncode, output = await loop.run_in_executor(None, self.run_request, request)
+            writer.write(json.dumps({"returncode": returncode, "output": output}).encode("utf-8"))
+            await writer.drain()
+        except ConnectionError as e:
+            logger.warning(f"[handle] Client went away -> {e}")
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Binds the socket and serves requests until cancelled."""
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        logger.info(f"[serve] Listening on {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="SyncNet inference server")
+    parser.add_argument("--socket", type=str, default=SYNCNET_SOCKET_PATH, help="UNIX socket path to listen on.")
+    parser.add_argument("--initial_model", type=str, default=SYNCNET_MODEL_PATH, help="Path to the pre-trained model.")
+    parser.add_argument("--fp16", action="store_true", default=SYNCNET_FP16, help="Run the model in half precision on CUDA.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    server = SyncNetServer(args.socket, args.initial_model, args.fp16)
+    server.load()
+    asyncio.run(server.serve())
+
+
+if __name__ == "__main__":
+    main()
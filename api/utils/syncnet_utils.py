@@ -8,14 +8,26 @@ Attributes:
     logger (logging.Logger): Logger for the module.
 """
 
-import os, shutil, asyncio, aiofiles
-from typing import Tuple, Union, Optional, Dict
+import os, sys, json, fcntl, shutil, asyncio, hashlib, functools, itertools
+from collections import OrderedDict
+from typing import Tuple, Union, Optional, Dict, List, Set, Any, Callable, Awaitable, Iterator
 import logging
 
 from api.config.settings import (
     DEFAULT_MAX_ITERATIONS,
-    TEMP_PROCESSING_DIR,
+    MIN_SYNC_DURATION_S,
+    SYNCNET_DEBUG_LOGS,
+    STRICT_VERIFY,
+    SPECULATIVE_FINALIZE,
+    REMUX_FINAL_SHIFT,
+    SYNCNET_SOCKET_PATH,
+    SYNCNET_FP16,
+    SYNCNET_TIMEOUT_S,
+    SYNCNET_GPUS,
+    INTERMEDIATE_DIR,
+    SHM_SCRATCH_DIR,
     FINAL_LOGS_DIR,
+    OFFSET_CACHE_PATH,
     FINAL_OUTPUT_DIR,
     DATA_WORK_PYAVI_DIR,
     DATA_WORK_DIR,
@@ -23,12 +35,34 @@ from api.config.settings import (
 )
 from api.utils.api_utils import ApiUtils
 from api.utils.file_utils import FileUtils
-from api.utils.ffmpeg_utils import FFmpegUtils
+from api.utils.ffmpeg_utils import FFmpegUtils, SHIFT_REMUX_CONTAINERS
 from api.utils.analysis_utils import AnalysisUtils
 from api.types.props import VideoProps, AudioProps, SyncError
 
 logger: logging.Logger = logging.getLogger('process_video')
 
+_background_tasks: Set[asyncio.Task] = set()
+_pending_writes: Set[asyncio.Task] = set()
+
+OFFSET_CACHE_SIZE = 512
+# A pass whose offset flips sign without shrinking below this share of the previous one is oscillating.
+OSCILLATION_RATIO = 0.8
+CONTENT_KEY_CHUNK = 1 << 20
+
+_offset_cache: "OrderedDict[str, int]" = OrderedDict()
+# (inode, mtime, size) of OFFSET_CACHE_PATH when it was last merged in. Every write swaps in a new
+# file, so a different stamp means another job or worker remembered an offset since.
+_offset_cache_stamp: Optional[Tuple[int, int, int]] = None
+# Hands out SYNCNET_GPUS round-robin to the SyncNet processes this API spawns.
+_gpu_cycle: Optional[Iterator[str]] = itertools.cycle(SYNCNET_GPUS) if SYNCNET_GPUS else None
+
+# Progress templates, filled from the update's fields by ApiUtils.update_progress.
+PASS_MSG = "Pass number {iteration} in progress..."
+ANALYZING_MSG = "Analyzing the results that came back..."
+OFFSET_MSG = "it is {offset_ms} milliseconds out of sync"
+CONVERGED_MSG = "Clip is now perfectly in sync; finishing..."
+SHIFT_MSG = "Total shift after pass {iteration} will be {total_shift_ms} ms. Adjusting the streams in your file..."
+
 
 class SyncNetUtils:
     """A collection of asynchronous utility methods for running SyncNet and FFmpeg tasks.
@@ -47,221 +81,566 @@ class SyncNetUtils:
         All methods are intended to be non-blocking and event-loop friendly
 
     Methods:
-        run_syncnet(ref_str: str, log_file: Optional[str] = None) -> str:
-            Runs the SyncNet model asynchronously and returns the log file path.
-        run_pipeline(video_file: str, ref: str) -> None:
-            Runs the SyncNet pipeline asynchronously.
+        run_syncnet(ref_str: str, log_file: Optional[str] = None, capture: bool = False) -> Union[str, bytes]:
+            Runs the SyncNet model asynchronously and returns the log file path, or the raw
+            output bytes when capture is set (then written to log_file in the background if one is given).
+        subprocess_env(gpu: Optional[str] = None) -> Optional[Dict[str, str]]:
+            Environment for a SyncNet child, pinning it to gpu, or else to the next of SYNCNET_GPUS,
+            via CUDA_VISIBLE_DEVICES.
+        write_log_in_background(log_file: str, data: bytes) -> asyncio.Task:
+            Persists captured output off the hot path; failures are logged, not raised.
+        flush_writes() -> None:
+            Waits for the writes still pending from write_log_in_background.
+        request_server(request: Dict[str, Any]) -> Optional[Tuple[int, bytes]]:
+            Sends a request to the resident SyncNet server and returns its return code and output,
+            or None if no server is listening or it failed without a usable reply.
+        start_server() -> Optional[asyncio.subprocess.Process]:
+            Spawns the resident SyncNet server at app start-up unless one is already listening,
+            pinned to the first of SYNCNET_GPUS.
+        stop_server(process: asyncio.subprocess.Process) -> None:
+            Terminates a server started by start_server.
+        run_pipeline(video_file: str, ref: str, reuse_ref: Optional[str] = None) -> None:
+            Runs the SyncNet pipeline asynchronously, on the resident server when one is listening.
+            With reuse_ref, the face tracks and crops of that earlier reference are reused and only the audio is redone.
         prepare_video(input_file: str, original_filename: str) -> Tuple[str, VideoProps, AudioProps, Union[int, float], str, int]:
             Prepares a video file for synchronization and returns the AVI file path,
             video properties, audio properties, frame rate, destination path, and reference number.
-        perform_sync_iterations(corrected_file: str, original_filename: str, fps: Union[int, float], reference_number: int) -> Union[SyncError, Tuple[int, str, int, int]]:
+        check_duration(vid_props: VideoProps, audio_props: AudioProps) -> None:
+            Raises a RuntimeError for clips too short for SyncNet, before any expensive work.
+        perform_sync_iterations(corrected_file: str, original_filename: str, fps: Union[int, float], reference_number: int, scratch_dir: Optional[str] = None, on_shift: Optional[Callable[[int], Awaitable[None]]] = None) -> Union[SyncError, Tuple[int, str, int, int, bool]]:
             Performs iterative synchronization using SyncNet and returns either a SyncError
-            or a tuple with total shift in ms, corrected file, updated reference number, and iteration count.
-        finalize_sync(input_file: str, original_filename: str, total_shift_ms: int, reference_number: int, fps: Union[int, float], destination_path: str, vid_props: VideoProps, audio_props: AudioProps, corrected_file: str) -> Union[str, SyncError]:
+            or a tuple with total shift in ms, corrected file, updated reference number, iteration count
+            and whether the loop converged on a zero offset. on_shift is awaited with each new running total.
+            Stops early with a SyncError naming the closest total tried when the offsets oscillate.
+        final_output_path(original_filename: str) -> Tuple[str, str]:
+            Names the final output for an upload and returns it with the upload's lower-cased extension.
+        write_final_shift(input_file: str, output_path: str, total_shift_ms: int, vid_props: VideoProps, audio_props: AudioProps) -> None:
+            Writes the upload with its audio shifted, in the container the output path names.
+        finalize_sync(input_file: str, original_filename: str, total_shift_ms: int, reference_number: int, fps: Union[int, float], destination_path: str, vid_props: VideoProps, audio_props: AudioProps, corrected_file: str, converged: bool = False, prepared_file: Optional[str] = None, output_path: Optional[str] = None, on_verified: Optional[Callable[[], Awaitable[None]]] = None) -> Union[str, SyncError]:
             Finalizes the synchronization process and returns either the final output path or a SyncError.
+            The SyncNet re-check is moved to the background when the iterations already converged, and
+            the final encode is skipped when prepared_file already holds it. on_verified is awaited once
+            the written file has been measured in sync, whichever way the check ran.
         synchronize_video(avi_file: str, input_file: str, original_filename: str, vid_props: VideoProps, audio_props: AudioProps, fps: Union[int, float], destination_path: str, reference_number: int) -> Union[Tuple[str, bool], SyncError]:
             Orchestrates the entire synchronization process and returns a tuple with the final
             output path and a boolean indicating if the clip was already synchronized, or a SyncError.
-        verify_synchronization(final_path: str, ref_str: str, fps: Union[int, float]) -> None:
-            Verifies the synchronization of the final output video.
+        make_scratch_dir(reference_number: int, source_file: str) -> str:
+            Creates the per-run directory for pass files, on tmpfs when it has room.
+        content_key(file_path: str) -> str:
+            Fingerprints a file so a re-submitted clip can reuse its cached offset.
+        lookup_offset(content_key: str) -> Optional[int]:
+            Returns the cached total shift for a previously synced file, or None. Re-reads
+            OFFSET_CACHE_PATH whenever another job or worker has written to it.
+        remember_offset(content_key: str, total_shift_ms: int) -> None:
+            Caches a file's verified total shift (LRU, OFFSET_CACHE_SIZE entries) and persists it
+            atomically, merging with entries other jobs or workers wrote.
+        verify_synchronization(final_path: str, ref_str: str, fps: Union[int, float]) -> int:
+            Verifies the synchronization of the final output video and reports the result over WebSocket.
+        start_verification(final_path: str, ref_str: str, fps: Union[int, float], on_verified: Optional[Callable[[], Awaitable[None]]] = None) -> asyncio.Task:
+            Runs verify_synchronization in the background so the caller can respond immediately,
+            awaiting on_verified if the file is found in sync.
+        cancel_verifications() -> None:
+            Cancels and awaits the background verifications still running.
     """
 
     @staticmethod
-    async def run_syncnet(ref_str: str, log_file: Optional[str] = None) -> str:
-        logger.debug(f"[run_syncnet][ENTER] ref_str='{ref_str}', log_file='{ref_str}'")
-        if log_file is None:
+    async def run_syncnet(ref_str: str, log_file: Optional[str] = None, capture: bool = False) -> Union[str, bytes]:
+        logger.debug("[run_syncnet][ENTER] ref_str='%s', log_file='%s', capture=%s", ref_str, log_file, capture)
+        if log_file is None and not capture:
             log_file = os.path.join(FINAL_LOGS_DIR, f"run_{ref_str}.log")
-        command_str = (
-            "python -m syncnet_python.run_syncnet "
-            f"--data_dir {DATA_WORK_DIR} --reference {ref_str}"
-        )
-        logger.debug(f"[run_syncnet] Constructed command: {command_str}")
-
-        process = await asyncio.create_subprocess_shell(
-            command_str,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT
+        command_args = ["-m", "syncnet_python.run_syncnet", "--data_dir", DATA_WORK_DIR, "--reference", ref_str]
+        if SYNCNET_FP16:
+            command_args.append("--fp16")
+        server_result = await SyncNetUtils.request_server(
+            {"op": "syncnet", "data_dir": DATA_WORK_DIR, "reference": ref_str}
         )
-        stdout_bytes, _ = await process.communicate()
-        stdout_decoded = stdout_bytes.decode()
-        async with aiofiles.open(log_file, 'w') as f:
-            await f.write(stdout_decoded)
-        logger.debug(f"[run_syncnet] Written output to log file: {ref_str}")
-
-        if process.returncode != 0:
-            error_msg = f"SyncNet failed for reference {ref_str} with return code {process.returncode}"
+        log_fd: Optional[int] = None
+        if server_result is not None:
+            returncode, stdout_bytes = server_result
+        else:
+            logger.debug("[run_syncnet] Constructed command: %s %s", sys.executable, ' '.join(command_args))
+            if not capture:
+                # Nothing needs the output in memory, so the child writes straight into the log.
+                log_fd = await ApiUtils.run_blocking(
+                    os.open, log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644
+                )
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, *command_args,
+                    close_fds=False,
+                    env=SyncNetUtils.subprocess_env(),
+                    stdout=asyncio.subprocess.PIPE if log_fd is None else log_fd,
+                    stderr=asyncio.subprocess.STDOUT
+                )
+                stdout_bytes, _ = await ApiUtils.communicate(
+                    process, SYNCNET_TIMEOUT_S, f"SyncNet for reference {ref_str}"
+                )
+            finally:
+                if log_fd is not None:
+                    os.close(log_fd)
+            returncode = process.returncode
+        if log_file is not None and capture:
+            SyncNetUtils.write_log_in_background(log_file, stdout_bytes)
+        elif log_file is not None and log_fd is None:
+            await FileUtils.write_bytes(log_file, stdout_bytes)
+            logger.debug("[run_syncnet] Written output to log file: %s", log_file)
+
+        if returncode != 0:
+            error_msg = f"SyncNet failed for reference {ref_str} with return code {returncode}"
             logger.error(f"[run_syncnet] {error_msg}")
             raise RuntimeError(error_msg)
+        if capture:
+            logger.info(f"SyncNet model completed successfully. Captured {len(stdout_bytes)} bytes for: {ref_str}")
+            logger.debug("[run_syncnet][EXIT] Returning captured output for: %s", ref_str)
+            return stdout_bytes
         logger.info(f"SyncNet model completed successfully. Log saved to: {ref_str}")
-        logger.debug(f"[run_syncnet][EXIT] Returning log_file: {ref_str}")
+        logger.debug("[run_syncnet][EXIT] Returning log_file: %s", ref_str)
         return log_file
 
     @staticmethod
-    async def run_pipeline(video_file: str, ref: str) -> None:
-        logger.debug(f"[run_pipeline][ENTER] video_file='{video_file}', ref='{ref}'")
-        command_str = (
-            "python -m syncnet_python.run_pipeline "
-            f"--videofile {video_file} --reference {ref}"
+    def subprocess_env(gpu: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Builds the environment for a SyncNet child, pinned to gpu or else to the next of SYNCNET_GPUS.
+
+        Args:
+            gpu (Optional[str]): A CUDA device id to pin the child to instead of taking the next one in turn.
+
+        Returns:
+            Optional[Dict[str, str]]: The current environment with CUDA_VISIBLE_DEVICES set, or None
+                                      to inherit it unchanged when no device is given and SYNCNET_GPUS is empty.
+        """
+        if gpu is None:
+            if _gpu_cycle is None:
+                return None
+            gpu = next(_gpu_cycle)
+        logger.debug("[subprocess_env] Pinning SyncNet child to CUDA device %s", gpu)
+        return {**os.environ, "CUDA_VISIBLE_DEVICES": gpu}
+
+    @staticmethod
+    def write_log_in_background(log_file: str, data: bytes) -> "asyncio.Task[str]":
+        logger.debug("[write_log_in_background] Scheduling write of %s bytes to %s", len(data), log_file)
+        task = asyncio.ensure_future(FileUtils.write_bytes(log_file, data))
+        _pending_writes.add(task)
+        task.add_done_callback(SyncNetUtils._on_log_written)
+        return task
+
+    @staticmethod
+    def _on_log_written(task: "asyncio.Task[str]") -> None:
+        _pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"[write_log_in_background] Log write failed -> {task.exception()}")
+
+    @staticmethod
+    async def flush_writes() -> None:
+        """Waits for every write scheduled by write_log_in_background, e.g. before shutdown."""
+        if _pending_writes:
+            logger.info(f"[flush_writes] Waiting for {len(_pending_writes)} pending log writes")
+            await asyncio.gather(*_pending_writes, return_exceptions=True)
+
+    @staticmethod
+    async def request_server(request: Dict[str, Any]) -> Optional[Tuple[int, bytes]]:
+        """Sends a request to the resident SyncNet server, if one is listening.
+
+        Args:
+            request (Dict[str, Any]): The request, e.g. {"op": "syncnet", "data_dir": ..., "reference": ...}.
+
+        Returns:
+            Optional[Tuple[int, bytes]]: The return code and captured output, or None when no server
+                                         is reachable, or it died or answered garbage mid-request, and
+                                         the caller should spawn a subprocess instead.
+
+        Raises:
+            RuntimeError: If the server gave no answer within SYNCNET_TIMEOUT_S. Only the wait is
+                          abandoned: the server cannot interrupt a request on its worker thread, so
+                          the run carries on holding that op's lock and later requests for the op
+                          queue behind it until it finishes.
+        """
+        try:
+            reader, writer = await asyncio.open_unix_connection(SYNCNET_SOCKET_PATH)
+        except OSError as e:
+            logger.debug("[request_server] No SyncNet server at %s -> %s", SYNCNET_SOCKET_PATH, e)
+            return None
+        try:
+            writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), SYNCNET_TIMEOUT_S)
+            # A server killed mid-request (OOM, CUDA crash) closes the socket without a reply.
+            response = json.loads(data.decode("utf-8"))
+            returncode, output = response["returncode"], response["output"]
+        except asyncio.TimeoutError:
+            error_msg = f"SyncNet server gave no answer to {request.get('op')} within {SYNCNET_TIMEOUT_S}s"
+            logger.error(f"[request_server] {error_msg}")
+            raise RuntimeError(error_msg)
+        except (ConnectionError, ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                f"[request_server] SyncNet server at {SYNCNET_SOCKET_PATH} failed {request.get('op')} "
+                f"without a usable reply ({e!r}) -> falling back to a subprocess"
+            )
+            return None
+        finally:
+            writer.close()
+        logger.debug("[request_server] %s returned %s", request.get('op'), returncode)
+        return returncode, output.encode("utf-8")
+
+    @staticmethod
+    async def start_server() -> Optional[asyncio.subprocess.Process]:
+        """Spawns the resident SyncNet server unless one is already listening.
+
+        The server binds SYNCNET_SOCKET_PATH once its model is loaded; until then
+        run_pipeline and run_syncnet keep falling back to subprocesses. It is pinned to the
+        first of SYNCNET_GPUS outside the round-robin, and while it is up every request runs
+        on that GPU; the others only serve the fallback subprocesses.
+
+        Returns:
+            Optional[asyncio.subprocess.Process]: The spawned server, or None if one was already running.
+        """
+        try:
+            _, writer = await asyncio.open_unix_connection(SYNCNET_SOCKET_PATH)
+        except OSError:
+            pass
+        else:
+            writer.close()
+            logger.info(f"[start_server] SyncNet server already listening on {SYNCNET_SOCKET_PATH}")
+            return None
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "api.utils.syncnet_server", "--socket", SYNCNET_SOCKET_PATH,
+            env=SyncNetUtils.subprocess_env(SYNCNET_GPUS[0]) if SYNCNET_GPUS else None,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL
         )
-        logger.debug(f"[run_pipeline] Constructed command: {command_str}")
+        logger.info(f"[start_server] Started SyncNet server (pid {process.pid}) on {SYNCNET_SOCKET_PATH}")
+        return process
+
+    @staticmethod
+    async def stop_server(process: asyncio.subprocess.Process) -> None:
+        """Stops a SyncNet server started by start_server.
+
+        Args:
+            process (asyncio.subprocess.Process): The server process.
+        """
+        if process.returncode is None:
+            process.terminate()
+            await process.wait()
+        logger.info(f"[stop_server] SyncNet server exited with {process.returncode}")
+
+    @staticmethod
+    async def run_pipeline(video_file: str, ref: str, reuse_ref: Optional[str] = None) -> None:
+        logger.debug("[run_pipeline][ENTER] video_file='%s', ref='%s', reuse_ref='%s'", video_file, ref, reuse_ref)
+        command_args = ["-m", "syncnet_python.run_pipeline", "--videofile", video_file, "--reference", ref]
+        request: Dict[str, Any] = {"op": "pipeline", "data_dir": DATA_WORK_DIR, "videofile": video_file, "reference": ref}
+        if reuse_ref is not None:
+            command_args += ["--reuse_reference", reuse_ref]
+            request["reuse_reference"] = reuse_ref
+        logger.debug("[run_pipeline] Constructed command: %s %s", sys.executable, ' '.join(command_args))
 
         log_file: str = os.path.join(os.path.dirname(FINAL_LOGS_DIR), 'pipeline.log')
-        process = await asyncio.create_subprocess_shell(
-            command_str,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT
-        )
-        stdout_bytes, _ = await process.communicate()
-        stdout_decoded = stdout_bytes.decode()
-        
-        async with aiofiles.open(log_file, 'w') as f:
-            await f.write(stdout_decoded)
-        logger.debug(f"[run_pipeline] Written output to log file: {ref}")
-
-        if process.returncode != 0:
-            error_msg = f"SyncNet pipeline failed for video {video_file} (ref={ref}) with return code {process.returncode}"
+        server_result = await SyncNetUtils.request_server(request)
+        if server_result is not None:
+            returncode, stdout_bytes = server_result
+        else:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, *command_args,
+                close_fds=False,
+                env=SyncNetUtils.subprocess_env(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            stdout_bytes, _ = await ApiUtils.communicate(
+                process, SYNCNET_TIMEOUT_S, f"SyncNet pipeline for reference {ref}"
+            )
+            returncode = process.returncode
+        # Nothing reads pipeline.log back, so the write stays off the pass's critical path.
+        SyncNetUtils.write_log_in_background(log_file, stdout_bytes)
+
+        if returncode != 0:
+            error_msg = f"SyncNet pipeline failed for video {video_file} (ref={ref}) with return code {returncode}"
             logger.error(f"[run_pipeline] {error_msg}")
             raise RuntimeError(error_msg)
         logger.info(f"SyncNet pipeline successfully executed for video: {video_file} with reference: {ref}")
-        logger.debug(f"[run_pipeline][EXIT] Completed pipeline run for video_file='{video_file}'")
+        logger.debug("[run_pipeline][EXIT] Completed pipeline run for video_file='%s'", video_file)
 
     @staticmethod
     async def prepare_video(input_file: str, original_filename: str) -> Tuple[str, VideoProps, AudioProps, Union[int, float], str, int]:
-        logger.debug(f"[prepare_video][ENTER] input_file='{input_file}', original_filename='{original_filename}'")
+        logger.debug("[prepare_video][ENTER] input_file='%s', original_filename='%s'", input_file, original_filename)
         ApiUtils.send_websocket_message("Here we go...")
         ApiUtils.send_websocket_message("Setting up our filing system...")
+        ApiUtils.send_websocket_message("Finding out about your file...")
 
-        dir_number_str = await FileUtils.get_next_directory_number(DATA_WORK_PYAVI_DIR)
+        # One reference per sync pass plus one for the final check. The first reservation scans
+        # DATA_WORK_PYAVI_DIR, so it runs alongside the ffprobe call.
+        dir_number_str, (vid_props, audio_props) = await asyncio.gather(
+            FileUtils.get_next_directory_number(DATA_WORK_PYAVI_DIR, reserve=DEFAULT_MAX_ITERATIONS + 1),
+            FFmpegUtils.get_stream_properties(input_file)
+        )
         reference_number: int = int(dir_number_str)
-        logger.debug(f"[prepare_video] Obtained reference_number: {reference_number}")
-
-        ApiUtils.send_websocket_message("Copying your file to work on...")
-        temp_copy_path = await FileUtils.copy_file(input_file, original_filename)
-        destination_path = os.path.join(DATA_DIR, f"{reference_number}_{original_filename}")
-        await FileUtils.move_file(temp_copy_path, destination_path)
-        logger.debug(f"[prepare_video] Moved file to destination_path: {destination_path}")
-        
-        exists = await ApiUtils.run_blocking(os.path.exists, destination_path)
-        if not exists:
-            error_msg = f"Destination file {destination_path} doesn't exist. Aborting process."
-            logger.error(f"[prepare_video] {error_msg}")
-            raise RuntimeError(error_msg)
-        else:
-            logger.debug(f"[prepare_video] Verified destination file exists.")
-
-        vid_props: Optional[VideoProps] = await FFmpegUtils.get_video_properties(input_file)
+        logger.debug("[prepare_video] Obtained reference_number: %s", reference_number)
 
-        logger.debug(f"[prepare_video] Video properties: {vid_props}")
+        logger.debug("[prepare_video] Video properties: %s", vid_props)
         if vid_props is None:
             error_msg = "Couldn't find any video stream"
             logger.error(f"[prepare_video] {error_msg}")
             raise RuntimeError(error_msg)
 
         fps: Union[int, float] = vid_props.get('fps')
-        ApiUtils.send_websocket_message("Finding out about your file...")
-
-        audio_props: Optional[AudioProps] = await FFmpegUtils.get_audio_properties(input_file)
 
-        logger.debug(f"[prepare_video] Audio properties: {audio_props}")
+        logger.debug("[prepare_video] Audio properties: %s", audio_props)
         if audio_props is None:
             error_msg = "No audio stream found in the video."
             logger.error(f"[prepare_video] {error_msg}")
             raise RuntimeError(error_msg)
 
+        SyncNetUtils.check_duration(vid_props, audio_props)
+
+        ApiUtils.send_websocket_message("Copying your file to work on...")
+        destination_path = os.path.join(DATA_DIR, f"{reference_number}_{original_filename}")
+        await FileUtils.link_or_copy(input_file, destination_path)
+        logger.debug("[prepare_video] Linked or copied file to destination_path: %s", destination_path)
+
         ext: str = os.path.splitext(original_filename)[1].lower()
         if ext == ".avi":
             avi_file: str = destination_path
-            logger.debug(f"[prepare_video] File already in AVI format. avi_file set to destination_path: {avi_file}")
+            logger.debug("[prepare_video] File already in AVI format. avi_file set to destination_path: %s", avi_file)
         else:
             logger.info("Converting file to avi for processing")
             avi_file = os.path.splitext(destination_path)[0] + "_reencoded.avi"
-            logger.debug(f"[prepare_video] Re-encoding to avi. New avi_file: {avi_file}")
-            await FFmpegUtils.reencode_to_avi(destination_path, avi_file)
+            remuxed: bool = False
+            if FFmpegUtils.can_remux_to_avi(vid_props, audio_props):
+                logger.debug("[prepare_video] Codecs are AVI compatible, remuxing. New avi_file: %s", avi_file)
+                try:
+                    await FFmpegUtils.remux_to_avi(destination_path, avi_file, vid_props.get('codec_name'))
+                    remuxed = True
+                except RuntimeError as e:
+                    logger.warning(f"[prepare_video] Remux failed, falling back to re-encode -> {e}")
+            if not remuxed:
+                logger.debug("[prepare_video] Re-encoding to avi. New avi_file: %s", avi_file)
+                await FFmpegUtils.reencode_to_avi(destination_path, avi_file)
 
         logger.debug(
-            f"[prepare_video][EXIT] Returning avi_file='{avi_file}', vid_props={vid_props}, "
-            f"audio_props={audio_props}, fps={fps}, destination_path='{destination_path}', reference_number={reference_number}"
+            "[prepare_video][EXIT] Returning avi_file='%s', vid_props=%s, "
+            "audio_props=%s, fps=%s, destination_path='%s', reference_number=%s",
+            avi_file, vid_props, audio_props, fps, destination_path, reference_number
         )
         return avi_file, vid_props, audio_props, fps, destination_path, reference_number
 
+    @staticmethod
+    def check_duration(vid_props: VideoProps, audio_props: AudioProps) -> None:
+        """Rejects clips too short for SyncNet before any copying, encoding or GPU work.
+
+        The pipeline drops face tracks shorter than 100 frames (4 s at 25 fps), so shorter
+        clips would only fail after a full pass. Streams whose duration ffprobe does not
+        report are let through.
+
+        Args:
+            vid_props (VideoProps): Properties of the video stream.
+            audio_props (AudioProps): Properties of the audio stream.
+
+        Raises:
+            RuntimeError: If the audio and video overlap for less than MIN_SYNC_DURATION_S seconds.
+        """
+        durations = [d for d in (vid_props.get('duration'), audio_props.get('duration')) if d is not None]
+        if durations and min(durations) < MIN_SYNC_DURATION_S:
+            error_msg = (
+                f"Clip too short to sync: audio and video need to overlap for at least "
+                f"{MIN_SYNC_DURATION_S:g} seconds, found {min(durations):.2f}."
+            )
+            logger.error(f"[check_duration] {error_msg}")
+            raise RuntimeError(error_msg)
+
     @staticmethod
     async def perform_sync_iterations(
         corrected_file: str,
         original_filename: str,
         fps: Union[int, float],
-        reference_number: int
-    ) -> Union[SyncError, Tuple[int, str, int, int]]:
+        reference_number: int,
+        scratch_dir: Optional[str] = None,
+        on_shift: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> Union[SyncError, Tuple[int, str, int, int, bool]]:
         logger.debug(
             "[DATA][ENTER] perform_sync_iterations -> "
-            f"corrected_file='{corrected_file}', original_filename='{original_filename}', "
-            f"fps={fps}, reference_number={reference_number}"
+            "corrected_file='%s', original_filename='%s', fps=%s, reference_number=%d, scratch_dir=%s",
+            corrected_file, original_filename, fps, reference_number, scratch_dir
         )
+        pass_dir: str = scratch_dir or INTERMEDIATE_DIR
         total_shift_ms: int = 0
         iteration_count: int = 0
+        converged: bool = False
+        # Prefixed with the run's first reference so concurrent runs on same-named files never collide.
+        base_name: str = f"{reference_number:05d}_{os.path.splitext(original_filename)[0]}"
+        frames_dir: str = os.path.join(DATA_WORK_DIR, "pyframes")
+        pass_audio_props: Optional[AudioProps] = None
+        source_file: str = corrected_file
+        # Passes only shift the audio and stream-copy the video, so from the second pass on the
+        # pipeline reuses the previous pass's face tracks and crops and re-extracts just the audio.
+        previous_ref: Optional[str] = None
+        previous_offset_ms: int = 0
+        best_offset_ms: Optional[int] = None
+        best_total_ms: int = 0
+        await ApiUtils.run_blocking(os.makedirs, pass_dir, exist_ok=True)
 
         for iteration in range(DEFAULT_MAX_ITERATIONS):
             iteration_count = iteration + 1
-            iteration_msg: str = f"Pass number {iteration_count} in progress..."
-            ApiUtils.send_websocket_message(iteration_msg)
-            logger.info(f"[perform_sync_iterations] {iteration_msg}")
+            ApiUtils.update_progress(iteration_count, "pipeline", PASS_MSG)
+            logger.info("[perform_sync_iterations] Pass number %d in progress...", iteration_count)
 
-            ref_str: str = f"{reference_number:05d}"
-            logger.debug(f"[perform_sync_iterations] Using ref_str: {ref_str}")
+            ref_str: str = "%05d" % reference_number
+            logger.debug("[perform_sync_iterations] Using ref_str: %s", ref_str)
 
-            await SyncNetUtils.run_pipeline(corrected_file, ref_str)
+            await SyncNetUtils.run_pipeline(corrected_file, ref_str, reuse_ref=previous_ref)
 
-            log_file: str = await SyncNetUtils.run_syncnet(ref_str)
+            debug_log: Optional[str] = os.path.join(FINAL_LOGS_DIR, f"run_{ref_str}.log") if SYNCNET_DEBUG_LOGS else None
+            # SyncNet reads the pass's face crops, never its frames, so those go while the model runs.
+            syncnet_output, _ = await asyncio.gather(
+                SyncNetUtils.run_syncnet(ref_str, debug_log, capture=True),
+                FileUtils.remove_tree(os.path.join(frames_dir, ref_str))
+            )
 
-            logger.debug(f"[perform_sync_iterations] Obtained log_file: {log_file}")
+            logger.debug("[perform_sync_iterations] Captured %d bytes of SyncNet output", len(syncnet_output))
 
-            ApiUtils.send_websocket_message("Analyzing the results that came back...")
-            sync_result = await AnalysisUtils.analyze_syncnet_log(log_file, fps)
+            ApiUtils.update_progress(iteration_count, "analyzing", ANALYZING_MSG)
+            sync_result = await AnalysisUtils.analyze_syncnet_bytes(syncnet_output, fps)
             offset_ms: int = sync_result.best_offset_ms 
             
-            ApiUtils.send_websocket_message(f"it is {offset_ms} milliseconds out of sync")
-            logger.debug(f"[perform_sync_iterations] Computed offset_ms: {offset_ms}")
+            ApiUtils.update_progress(iteration_count, "analyzed", OFFSET_MSG, offset_ms=offset_ms)
+            logger.debug("[perform_sync_iterations] Computed offset_ms: %d", offset_ms)
 
             if offset_ms == 0:
                 if iteration == 0:
                     logger.debug("[perform_sync_iterations] Zero offset on first iteration -> already in sync.")
-                    logger.debug(f"[perform_sync_iterations][EXIT] Returning (0, {corrected_file}, {reference_number}, {iteration_count})")
-                    return (0, corrected_file, reference_number, iteration_count)
+                    logger.debug(
+                        "[perform_sync_iterations][EXIT] Returning (0, %s, %d, %d, True)",
+                        corrected_file, reference_number, iteration_count
+                    )
+                    return (0, corrected_file, reference_number, iteration_count, True)
                 else:
-                    ApiUtils.send_websocket_message("Clip is now perfectly in sync; finishing...")
-                    logger.debug(f"[perform_sync_iterations] Ending iterations at iteration_count: {iteration_count}")
+                    ApiUtils.update_progress(
+                        iteration_count, "converged", CONVERGED_MSG, total_shift_ms=total_shift_ms
+                    )
+                    logger.debug("[perform_sync_iterations] Ending iterations at iteration_count: %d", iteration_count)
+                    converged = True
                     break
 
-            total_shift_ms += offset_ms
-            logger.debug(f"[perform_sync_iterations] Total shift after pass {iteration_count}: {total_shift_ms}")
+            if best_offset_ms is None or abs(offset_ms) < abs(best_offset_ms):
+                best_offset_ms, best_total_ms = offset_ms, total_shift_ms
+            if (
+                iteration >= 2
+                and (offset_ms > 0) != (previous_offset_ms > 0)
+                and abs(offset_ms) >= abs(previous_offset_ms) * OSCILLATION_RATIO
+            ):
+                # No total seen measured in sync, so writing and re-checking the best one could only fail.
+                logger.warning(
+                    "[perform_sync_iterations] Offsets oscillating (%d then %d ms) -> giving up; the closest "
+                    "total seen, %d ms, still measured %d ms out.",
+                    previous_offset_ms, offset_ms, best_total_ms, best_offset_ms
+                )
+                ApiUtils.send_websocket_message(
+                    "The measured offset kept flipping back and forth between passes, so we couldn't settle on a shift."
+                )
+                return SyncError(
+                    error=True,
+                    message=(
+                        f"Couldn't sync your clip: the measured offset kept flipping between passes. The closest "
+                        f"shift tried was {best_total_ms} ms, which still left it {best_offset_ms} ms out."
+                    ),
+                    final_offset=best_offset_ms
+                )
+            previous_offset_ms = offset_ms
 
-            offset_msg: str = f"Total shift after pass {iteration_count} will be {total_shift_ms} ms."
-            ApiUtils.send_websocket_message(offset_msg)
-            logger.info(f"[perform_sync_iterations] {offset_msg}")
+            total_shift_ms += offset_ms
+            logger.debug("[perform_sync_iterations] Total shift after pass %d: %d", iteration_count, total_shift_ms)
 
-            base_name: str = os.path.splitext(original_filename)[0]
-            new_corrected_file: str = os.path.join(
-                TEMP_PROCESSING_DIR,
-                f"corrected_iter{iteration_count}_{base_name}.avi"
+            ApiUtils.update_progress(
+                iteration_count, "shifting", SHIFT_MSG, total_shift_ms=total_shift_ms
             )
-            logger.debug(f"[perform_sync_iterations] New corrected file will be: {new_corrected_file}")
-
-            ApiUtils.send_websocket_message("Adjusting the streams in your file...")
-            await FFmpegUtils.shift_audio(corrected_file, new_corrected_file, offset_ms)
-
-            exists = await ApiUtils.run_blocking(os.path.exists, new_corrected_file)
-            if not exists:
-                error_msg = f"Corrected file {new_corrected_file} was not created. Aborting process."
-                logger.error(f"[perform_sync_iterations] {error_msg}")
-                raise RuntimeError(error_msg)
+            logger.info(
+                "[perform_sync_iterations] Total shift after pass %d will be %d ms.",
+                iteration_count, total_shift_ms
+            )
+            if on_shift is not None:
+                await on_shift(total_shift_ms)
+
+            new_corrected_file: str = f"{pass_dir}/corrected_iter{iteration_count}_{base_name}.avi"
+            logger.debug("[perform_sync_iterations] New corrected file will be: %s", new_corrected_file)
+
+            # Every pass file shares the first one's audio layout, so probe it once. Passes only
+            # feed SyncNet, so their audio is kept as PCM rather than re-encoded lossily each time.
+            if pass_audio_props is None:
+                pass_audio_props = await FFmpegUtils.get_audio_properties(corrected_file)
+            await FFmpegUtils.shift_audio(
+                corrected_file, new_corrected_file, offset_ms, pass_audio_props, audio_codec="pcm_s16le"
+            )
+            previous_file: str = corrected_file
             corrected_file = new_corrected_file
+            if previous_file != source_file:
+                await FileUtils.cleanup_file(previous_file)
+            previous_ref = ref_str
             reference_number += 1
-            logger.debug(f"[perform_sync_iterations] Updated corrected_file: {corrected_file}, updated reference_number: {reference_number}")
+            logger.debug(
+                "[perform_sync_iterations] Updated corrected_file: %s, updated reference_number: %d",
+                corrected_file, reference_number
+            )
 
         logger.debug(
-            f"[DATA][EXIT] perform_sync_iterations -> total_shift_ms={total_shift_ms}, "
-            f"corrected_file='{corrected_file}', updated_reference_number={reference_number}, iteration_count={iteration_count}"
+            "[DATA][EXIT] perform_sync_iterations -> total_shift_ms=%d, corrected_file='%s', "
+            "updated_reference_number=%d, iteration_count=%d, converged=%s",
+            total_shift_ms, corrected_file, reference_number, iteration_count, converged
         )
-        return (total_shift_ms, corrected_file, reference_number, iteration_count)
+        return (total_shift_ms, corrected_file, reference_number, iteration_count, converged)
+
+    @staticmethod
+    def final_output_path(original_filename: str) -> Tuple[str, str]:
+        """Names the final output for an upload.
+
+        AVI uploads keep their name behind a "corrected_" prefix; other containers get a
+        "_restored" suffix since they are written back to their original format.
+
+        Args:
+            original_filename (str): The uploaded file's name.
+
+        Returns:
+            Tuple[str, str]: The final output path and the upload's lower-cased extension.
+        """
+        base_name, ext = os.path.splitext(original_filename)
+        ext = ext.lower()
+        if ext == ".avi":
+            return os.path.join(FINAL_OUTPUT_DIR, f"corrected_{original_filename}"), ext
+        return os.path.join(FINAL_OUTPUT_DIR, f"corrected_{base_name}_restored{ext}"), ext
+
+    @staticmethod
+    async def write_final_shift(
+        input_file: str,
+        output_path: str,
+        total_shift_ms: int,
+        vid_props: VideoProps,
+        audio_props: AudioProps
+    ) -> None:
+        """Writes the input with its audio shifted by total_shift_ms, in the container output_path names.
+
+        Args:
+            input_file (str): The original upload.
+            output_path (str): Where to write the shifted file; its extension picks the container.
+            total_shift_ms (int): Total millisecond offset to shift the audio.
+            vid_props (VideoProps): The upload's video properties.
+            audio_props (AudioProps): The upload's audio properties.
+        """
+        original_ext: str = os.path.splitext(output_path)[1].lower()
+        if total_shift_ms == 0:
+            logger.info("[write_final_shift] Passes cancelled out to a zero shift -> reusing the input file as is.")
+            await FileUtils.link_or_copy(input_file, output_path)
+        elif original_ext == ".avi":
+            await FFmpegUtils.apply_cumulative_shift(input_file, output_path, total_shift_ms)
+        else:
+            if REMUX_FINAL_SHIFT and original_ext in SHIFT_REMUX_CONTAINERS:
+                try:
+                    await FFmpegUtils.apply_shift_by_remux(input_file, output_path, total_shift_ms)
+                    return
+                except RuntimeError as e:
+                    logger.warning(f"[write_final_shift] Remux shift failed, re-encoding instead -> {e}")
+            logger.info("[write_final_shift] Shifting and restoring the original container/codec in one pass.")
+            original_video_codec: Optional[str] = vid_props.get('codec_name')
+            original_audio_codec: Optional[str] = audio_props.get('codec_name')
+            await FFmpegUtils.apply_shift_and_restore(
+                input_file, output_path, total_shift_ms, original_ext,
+                original_video_codec, original_audio_codec
+            )
 
     @staticmethod
     async def finalize_sync(
@@ -273,35 +652,63 @@ class SyncNetUtils:
         destination_path: str,
         vid_props: VideoProps,
         audio_props: AudioProps,
-        corrected_file: str
+        corrected_file: str,
+        converged: bool = False,
+        prepared_file: Optional[str] = None,
+        output_path: Optional[str] = None,
+        on_verified: Optional[Callable[[], Awaitable[None]]] = None
     ) -> Union[str, SyncError]:
         logger.debug(
             "[DATA][ENTER] finalize_sync -> "
-            f"input_file='{input_file}', original_filename='{original_filename}', total_shift_ms={total_shift_ms}, "
-            f"reference_number={reference_number}, fps={fps}, destination_path='{destination_path}', "
-            f"corrected_file='{corrected_file}'"
+            "input_file='%s', original_filename='%s', total_shift_ms=%s, "
+            "reference_number=%s, fps=%s, destination_path='%s', "
+            "corrected_file='%s', converged=%s, prepared_file='%s'",
+            input_file, original_filename, total_shift_ms,
+            reference_number, fps, destination_path,
+            corrected_file, converged, prepared_file
         )
-        final_output_path: str = os.path.join(FINAL_OUTPUT_DIR, f"corrected_{original_filename}")
-        logger.debug(f"[finalize_sync] Final output path set to: {final_output_path}")
+        final_output_path: str = output_path or SyncNetUtils.final_output_path(original_filename)[0]
+        logger.debug("[finalize_sync] Final output path set to: %s", final_output_path)
 
         ApiUtils.send_websocket_message("Making the final shift...")
 
-        await FFmpegUtils.apply_cumulative_shift(input_file, final_output_path, total_shift_ms)
+        if prepared_file is not None:
+            logger.info("[finalize_sync] Final shift was encoded during the last pass -> moving it into place.")
+            final_shift = FileUtils.move_file(prepared_file, final_output_path)
+        else:
+            final_shift = SyncNetUtils.write_final_shift(
+                input_file, final_output_path, total_shift_ms, vid_props, audio_props
+            )
 
+        if corrected_file != destination_path:
+            await asyncio.gather(final_shift, FileUtils.cleanup_file(corrected_file))
+            logger.debug("[finalize_sync] Removed old corrected_file: '%s'", corrected_file)
+        else:
+            await final_shift
         logger.debug("[finalize_sync] Applied cumulative shift.")
 
-        ApiUtils.send_websocket_message("Double checking everything...")
+        final_offset: int = 0
         ref_str: str = f"{reference_number:05d}"
-        logger.debug(f"[finalize_sync] Using ref_str for final check: {ref_str}")
-        await SyncNetUtils.run_pipeline(final_output_path, ref_str)
+        if converged and not STRICT_VERIFY:
+            # The last pass already measured a zero offset; confirm the written file off the response path.
+            logger.debug("[finalize_sync] Iterations converged on a zero offset -> verifying in the background.")
+            SyncNetUtils.start_verification(final_output_path, ref_str, fps, on_verified)
+            on_verified = None
+        else:
+            ApiUtils.send_websocket_message("Double checking everything...")
+            logger.debug("[finalize_sync] Using ref_str for final check: %s", ref_str)
+            await SyncNetUtils.run_pipeline(final_output_path, ref_str)
+
+            final_log: str = os.path.join(FINAL_LOGS_DIR, f"final_output_{ref_str}.log")
+            final_output, _ = await asyncio.gather(
+                SyncNetUtils.run_syncnet(ref_str, final_log, capture=True),
+                FileUtils.remove_tree(os.path.join(DATA_WORK_DIR, "pyframes", ref_str))
+            )
 
-        final_log: str = os.path.join(FINAL_LOGS_DIR, f"final_output_{ref_str}.log")
-        await SyncNetUtils.run_syncnet(ref_str, final_log)
+            analysis_result = await AnalysisUtils.analyze_syncnet_bytes(final_output, fps)
+            final_offset = analysis_result.best_offset_ms
 
-        analysis_result = await AnalysisUtils.analyze_syncnet_log(final_log, fps)
-        final_offset: int = analysis_result.best_offset_ms
-
-        logger.debug(f"[finalize_sync] Analyzed final_offset: {final_offset}")
+            logger.debug("[finalize_sync] Analyzed final_offset: %s", final_offset)
 
         if final_offset != 0:
             error_msg: str = "final offset incorrect"
@@ -315,28 +722,10 @@ class SyncNetUtils:
                 final_offset=final_offset
             )
 
-        exists = await ApiUtils.run_blocking(os.path.exists, corrected_file)
-        if corrected_file != destination_path and exists:
-            await FileUtils.cleanup_file(corrected_file)
-            logger.debug(f"[finalize_sync] Removed old corrected_file: '{corrected_file}'")
-
-        original_ext: str = os.path.splitext(original_filename)[1].lower()
-        if original_ext == ".avi":
-            logger.info("[finalize_sync] Original file was AVI -> skipping re-encode.")
-            logger.debug(f"[finalize_sync][EXIT] Returning final_output_path: '{final_output_path}'")
-            return final_output_path
-        else:
-            logger.info("[finalize_sync] Re-encoding final output back to original container/codec.")
-            original_video_codec: Optional[str] = vid_props.get('codec_name')
-            original_audio_codec: Optional[str] = audio_props.get('codec_name')
-            restored_final: str = os.path.splitext(final_output_path)[0] + "_restored" + original_ext
-            logger.debug(f"[finalize_sync] Restored final path: {restored_final}")
-            await FFmpegUtils.reencode_to_original_format(
-                final_output_path, restored_final, original_ext,
-                original_video_codec, original_audio_codec
-            )
-            logger.debug(f"[finalize_sync][EXIT] Returning restored_final: '{restored_final}'")
-            return restored_final
+        if on_verified is not None:
+            await on_verified()
+        logger.debug("[finalize_sync][EXIT] Returning final_output_path: '%s'", final_output_path)
+        return final_output_path
 
     @staticmethod
     async def synchronize_video(
@@ -348,58 +737,133 @@ class SyncNetUtils:
         fps: Union[int, float],
         destination_path: str,
         reference_number: int
+    ) -> Union[Tuple[str, bool], SyncError]:
+        scratch_dir: str = await SyncNetUtils.make_scratch_dir(reference_number, avi_file)
+        speculative: Optional[SpeculativeShift] = (
+            SpeculativeShift(input_file, original_filename, vid_props, audio_props, reference_number)
+            if SPECULATIVE_FINALIZE else None
+        )
+        try:
+            return await SyncNetUtils._synchronize_video(
+                avi_file, input_file, original_filename, vid_props,
+                audio_props, fps, destination_path, reference_number, scratch_dir, speculative
+            )
+        except FileNotFoundError as e:
+            error_msg = f"A working file went missing during synchronization: {e}"
+            logger.error(f"[synchronize_video] {error_msg}")
+            raise RuntimeError(error_msg) from e
+        finally:
+            if speculative is not None:
+                await speculative.discard()
+            await FileUtils.remove_tree(scratch_dir)
+
+    @staticmethod
+    async def make_scratch_dir(reference_number: int, source_file: str) -> str:
+        """Creates the per-run directory that holds the pass files.
+
+        The directory goes under SHM_SCRATCH_DIR when its tmpfs mount has room for two copies
+        of the source (the previous and the current pass file), and under INTERMEDIATE_DIR otherwise.
+
+        Args:
+            reference_number (int): The run's first reference number, used as the directory name.
+            source_file (str): The file the passes start from, used to size the scratch space.
+
+        Returns:
+            str: Path of the created directory.
+        """
+        return await ApiUtils.run_blocking(SyncNetUtils._make_scratch_dir_blocking, reference_number, source_file)
+
+    @staticmethod
+    def _make_scratch_dir_blocking(reference_number: int, source_file: str) -> str:
+        base_dir: str = INTERMEDIATE_DIR
+        shm_mount: str = os.path.dirname(SHM_SCRATCH_DIR.rstrip("/")) if SHM_SCRATCH_DIR else ""
+        if shm_mount and os.path.ismount(shm_mount):
+            try:
+                needed: int = 2 * os.path.getsize(source_file)
+                if shutil.disk_usage(shm_mount).free > needed:
+                    base_dir = SHM_SCRATCH_DIR
+            except OSError as e:
+                logger.debug("[make_scratch_dir] Could not size tmpfs scratch -> %s", e)
+        scratch_dir: str = os.path.join(base_dir, f"{reference_number:05d}")
+        os.makedirs(scratch_dir, exist_ok=True)
+        logger.debug("[make_scratch_dir] Pass files go to '%s'", scratch_dir)
+        return scratch_dir
+
+    @staticmethod
+    async def _synchronize_video(
+        avi_file: str,
+        input_file: str,
+        original_filename: str,
+        vid_props: VideoProps,
+        audio_props: AudioProps,
+        fps: Union[int, float],
+        destination_path: str,
+        reference_number: int,
+        scratch_dir: Optional[str] = None,
+        speculative: Optional["SpeculativeShift"] = None
     ) -> Union[Tuple[str, bool], SyncError]:
         logger.debug(
             "[DATA][ENTER] synchronize_video -> "
-            f"avi_file='{avi_file}', input_file='{input_file}', original_filename='{original_filename}', "
-            f"vid_props={vid_props}, audio_props={audio_props}, fps={fps}, "
-            f"destination_path='{destination_path}', reference_number={reference_number}"
+            "avi_file='%s', input_file='%s', original_filename='%s', "
+            "vid_props=%s, audio_props=%s, fps=%s, "
+            "destination_path='%s', reference_number=%s",
+            avi_file, input_file, original_filename,
+            vid_props, audio_props, fps,
+            destination_path, reference_number
         )
         ApiUtils.send_websocket_message("Ok, had a look, let's begin to sync...")
-
-        sync_iterations_result = await SyncNetUtils.perform_sync_iterations(
-            corrected_file=avi_file,
-            original_filename=original_filename,
-            fps=fps,
-            reference_number=reference_number
-        )
-        logger.debug(f"[synchronize_video] perform_sync_iterations returned: {sync_iterations_result}")
+        # Named once per run; both the already-in-sync link and finalize_sync write here.
+        final_output_path: str = SyncNetUtils.final_output_path(original_filename)[0]
+
+        content_key: str = await SyncNetUtils.content_key(input_file)
+        cached_shift: Optional[int] = await SyncNetUtils.lookup_offset(content_key)
+        if cached_shift is not None:
+            logger.info(f"[synchronize_video] Offset cache hit -> total_shift_ms={cached_shift}")
+            ApiUtils.send_websocket_message("We've synced this clip before, reusing what we found...")
+            # Shaped like a converged loop result; no pass file exists, so destination_path stands in for it.
+            # Only verified totals are cached, and finalize_sync still checks the written file in the background.
+            sync_iterations_result = (
+                cached_shift, destination_path, reference_number, 1 if cached_shift == 0 else 0, True
+            )
+        else:
+            sync_iterations_result = await SyncNetUtils.perform_sync_iterations(
+                corrected_file=avi_file,
+                original_filename=original_filename,
+                fps=fps,
+                reference_number=reference_number,
+                scratch_dir=scratch_dir,
+                on_shift=speculative.start if speculative is not None else None
+            )
+        logger.debug("[synchronize_video] perform_sync_iterations returned: %s", sync_iterations_result)
 
         if isinstance(sync_iterations_result, SyncError):
-            logger.debug(f"[synchronize_video][EXIT] Returning SyncError: {sync_iterations_result}")
+            logger.debug("[synchronize_video][EXIT] Returning SyncError: %s", sync_iterations_result)
             return sync_iterations_result
 
-        total_shift_ms, final_corrected_file, updated_reference_number, iteration_count = sync_iterations_result
+        total_shift_ms, final_corrected_file, updated_reference_number, iteration_count, converged = sync_iterations_result
         logger.info(
             "[synchronize_video] "
             f"iteration_count={iteration_count}, total_shift_ms={total_shift_ms}, final_corrected_file='{final_corrected_file}', "
-            f"updated_reference_number={updated_reference_number}"
+            f"updated_reference_number={updated_reference_number}, converged={converged}"
         )
 
         if iteration_count == 1 and total_shift_ms == 0:
             ApiUtils.send_websocket_message(
                 "Your clip was already in sync on the first pass; skipping final verification."
             )
-            final_output_path: str = os.path.join(FINAL_OUTPUT_DIR, f"corrected_{original_filename}")
-            if os.path.splitext(original_filename)[1].lower() == ".avi":
-                await FileUtils.copy_file(input_file, final_output_path)
-                logger.debug(f"[synchronize_video] Copied original file to final_output_path: {final_output_path}")
-            else:
-                original_ext: str = os.path.splitext(original_filename)[1].lower()
-                original_video_codec: Optional[str] = vid_props.get('codec_name')
-                original_audio_codec: Optional[str] = audio_props.get('codec_name')
-                restored_final: str = os.path.splitext(final_output_path)[0] + "_restored" + original_ext
-                logger.debug(f"[synchronize_video] Re-encoding input file to restored_final: {restored_final}")
-                await FFmpegUtils.reencode_to_original_format(
-                    input_file, restored_final, original_ext,
-                    original_video_codec, original_audio_codec
-                )
-                final_output_path = restored_final
+            # The upload already is the final output, in its original container and codecs.
+            await SyncNetUtils.write_final_shift(input_file, final_output_path, 0, vid_props, audio_props)
+            logger.debug("[synchronize_video] Linked original file to final_output_path: %s", final_output_path)
 
-            logger.debug(f"[synchronize_video][EXIT] Returning (final_output_path='{final_output_path}', already_in_sync=True)")
+            if cached_shift is None:
+                await SyncNetUtils.remember_offset(content_key, 0)
+            logger.debug("[synchronize_video][EXIT] Returning (final_output_path='%s', already_in_sync=True)", final_output_path)
             return (final_output_path, True)
 
-        final_output_path = await SyncNetUtils.finalize_sync(
+        prepared_file: Optional[str] = (
+            await speculative.take(total_shift_ms) if speculative is not None else None
+        )
+        final_result = await SyncNetUtils.finalize_sync(
             input_file=input_file,
             original_filename=original_filename,
             total_shift_ms=total_shift_ms,
@@ -408,27 +872,282 @@ class SyncNetUtils:
             destination_path=destination_path,
             vid_props=vid_props,
             audio_props=audio_props,
-            corrected_file=final_corrected_file
+            corrected_file=final_corrected_file,
+            converged=converged,
+            prepared_file=prepared_file,
+            output_path=final_output_path,
+            # Cached only once the written file measures in sync, so a rejected total is never served again.
+            on_verified=(
+                functools.partial(SyncNetUtils.remember_offset, content_key, total_shift_ms)
+                if cached_shift is None else None
+            )
         )
 
-        if isinstance(final_output_path, SyncError):
-            logger.debug(f"[synchronize_video][EXIT] Returning SyncError from finalize_sync: {final_output_path}")
-            return final_output_path
+        if isinstance(final_result, SyncError):
+            logger.debug("[synchronize_video][EXIT] Returning SyncError from finalize_sync: %s", final_result)
+            return final_result
 
-        logger.debug(f"[synchronize_video][EXIT] Returning (final_output_path='{final_output_path}', already_in_sync=False)")
+        logger.debug("[synchronize_video][EXIT] Returning (final_output_path='%s', already_in_sync=False)", final_output_path)
         return (final_output_path, False)
 
     @staticmethod
-    async def verify_synchronization(final_path: str, ref_str: str, fps: Union[int, float]) -> None:
+    async def content_key(file_path: str) -> str:
+        """Fingerprints a file by its size and its first and last CONTENT_KEY_CHUNK bytes.
+
+        Args:
+            file_path (str): The file to fingerprint.
+
+        Returns:
+            str: A hex BLAKE2b digest identifying the file's content.
+        """
+        return await ApiUtils.run_blocking(SyncNetUtils._content_key_blocking, file_path)
+
+    @staticmethod
+    def _content_key_blocking(file_path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            digest.update(f.read(CONTENT_KEY_CHUNK))
+            if size > CONTENT_KEY_CHUNK:
+                f.seek(max(CONTENT_KEY_CHUNK, size - CONTENT_KEY_CHUNK))
+                digest.update(f.read(CONTENT_KEY_CHUNK))
+        digest.update(str(size).encode("ascii"))
+        return digest.hexdigest()
+
+    @staticmethod
+    async def lookup_offset(content_key: str) -> Optional[int]:
+        """Returns the total shift found for a previously synced file, if it is cached.
+
+        OFFSET_CACHE_PATH is merged into the in-memory cache whenever it has changed since it
+        was last read, so offsets remembered by other workers are found too.
+
+        Args:
+            content_key (str): The file's content_key.
+
+        Returns:
+            Optional[int]: The cached total shift in ms, or None on a miss.
+        """
+        global _offset_cache_stamp
+        loaded: Optional[Tuple[Tuple[int, int, int], List[Tuple[str, int]]]] = None
+        try:
+            loaded = await ApiUtils.run_blocking(SyncNetUtils._read_offset_cache_blocking, _offset_cache_stamp)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug("[lookup_offset] Offset cache not read -> %s", e)
+        if loaded is not None:
+            _offset_cache_stamp, entries = loaded
+            _offset_cache.update(entries)
+            while len(_offset_cache) > OFFSET_CACHE_SIZE:
+                _offset_cache.popitem(last=False)
+            logger.debug("[lookup_offset] Merged %s cached offsets from disk", len(entries))
+        shift = _offset_cache.get(content_key)
+        if shift is not None:
+            _offset_cache.move_to_end(content_key)
+        return shift
+
+    @staticmethod
+    def _read_offset_cache_blocking(
+        known_stamp: Optional[Tuple[int, int, int]]
+    ) -> Optional[Tuple[Tuple[int, int, int], List[Tuple[str, int]]]]:
+        # Raises FileNotFoundError until the first offset is remembered; None means nothing changed.
+        with open(OFFSET_CACHE_PATH, "r") as f:
+            st = os.fstat(f.fileno())
+            stamp: Tuple[int, int, int] = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if stamp == known_stamp:
+                return None
+            return stamp, [(key, int(shift)) for key, shift in json.load(f)]
+
+    @staticmethod
+    async def remember_offset(content_key: str, total_shift_ms: int) -> None:
+        """Caches the total shift for a file and persists the cache to OFFSET_CACHE_PATH.
+
+        Only call this for a total whose output was measured in sync; cache hits skip the passes.
+
+        Args:
+            content_key (str): The file's content_key.
+            total_shift_ms (int): The shift that synced the file.
+        """
+        _offset_cache[content_key] = total_shift_ms
+        _offset_cache.move_to_end(content_key)
+        while len(_offset_cache) > OFFSET_CACHE_SIZE:
+            _offset_cache.popitem(last=False)
+        try:
+            await ApiUtils.run_blocking(SyncNetUtils._persist_offset_blocking, content_key, total_shift_ms)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[remember_offset] Could not persist the offset cache -> {e}")
+
+    @staticmethod
+    def _persist_offset_blocking(content_key: str, total_shift_ms: int) -> None:
+        # Read-modify-write under an exclusive flock, so concurrent jobs and other workers never
+        # lose each other's entries, then swap the file in whole so a crash cannot truncate it.
+        lock_fd = os.open(f"{OFFSET_CACHE_PATH}.lock", os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+            entries: "OrderedDict[str, int]" = OrderedDict()
+            try:
+                with open(OFFSET_CACHE_PATH, "r") as f:
+                    entries.update((key, int(shift)) for key, shift in json.load(f))
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError) as e:
+                logger.warning(f"[remember_offset] Discarding unreadable offset cache -> {e}")
+            entries.pop(content_key, None)
+            entries[content_key] = total_shift_ms
+            while len(entries) > OFFSET_CACHE_SIZE:
+                entries.popitem(last=False)
+            tmp_path: str = f"{OFFSET_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(list(entries.items()), f)
+            os.replace(tmp_path, OFFSET_CACHE_PATH)
+        finally:
+            os.close(lock_fd)
+
+    @staticmethod
+    async def verify_synchronization(final_path: str, ref_str: str, fps: Union[int, float]) -> int:
         logger.debug(
-            f"[verify_synchronization][ENTER] final_path='{final_path}', ref_str='{ref_str}', fps={fps}"
+            "[verify_synchronization][ENTER] final_path='%s', ref_str='%s', fps=%s",
+            final_path, ref_str, fps
         )
         logger.info("[verify_synchronization] Starting final verification pipeline...")
         await SyncNetUtils.run_pipeline(final_path, ref_str)
 
         final_log: str = os.path.join(FINAL_LOGS_DIR, f"final_output_{ref_str}.log")
-        await SyncNetUtils.run_syncnet(ref_str, final_log)
+        final_output, _ = await asyncio.gather(
+            SyncNetUtils.run_syncnet(ref_str, final_log, capture=True),
+            FileUtils.remove_tree(os.path.join(DATA_WORK_DIR, "pyframes", ref_str))
+        )
 
-        final_offset: int = await AnalysisUtils.analyze_syncnet_log(final_log, fps)
+        analysis_result = await AnalysisUtils.analyze_syncnet_bytes(final_output, fps)
+        final_offset: int = analysis_result.best_offset_ms
         logger.info(f"[verify_synchronization] final_offset -> {final_offset} ms")
+        if final_offset == 0:
+            ApiUtils.send_websocket_message("Final check complete: your clip is in sync.")
+        else:
+            ApiUtils.send_websocket_message(f"Final check found a remaining offset of {final_offset} ms.")
         logger.debug("[verify_synchronization][EXIT]")
+        return final_offset
+
+    @staticmethod
+    def start_verification(
+        final_path: str,
+        ref_str: str,
+        fps: Union[int, float],
+        on_verified: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> "asyncio.Task[int]":
+        logger.debug("[start_verification] Scheduling background verification for '%s'", final_path)
+        task = asyncio.ensure_future(SyncNetUtils._verify_in_background(final_path, ref_str, fps, on_verified))
+        _background_tasks.add(task)
+        task.add_done_callback(SyncNetUtils._on_verification_done)
+        return task
+
+    @staticmethod
+    async def _verify_in_background(
+        final_path: str,
+        ref_str: str,
+        fps: Union[int, float],
+        on_verified: Optional[Callable[[], Awaitable[None]]]
+    ) -> int:
+        final_offset: int = await SyncNetUtils.verify_synchronization(final_path, ref_str, fps)
+        if final_offset == 0 and on_verified is not None:
+            await on_verified()
+        return final_offset
+
+    @staticmethod
+    async def cancel_verifications() -> None:
+        """Cancels background verifications still running, e.g. on shutdown, and waits for them to stop."""
+        if _background_tasks:
+            logger.info(f"[cancel_verifications] Cancelling {len(_background_tasks)} background verifications")
+            tasks = list(_background_tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _on_verification_done(task: "asyncio.Task[int]") -> None:
+        _background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"[start_verification] Background verification failed -> {task.exception()}")
+            ApiUtils.send_websocket_message("Final check could not be completed.")
+
+
+class SpeculativeShift:
+    """Encodes the final output for the latest running total while the sync loop verifies it.
+
+    The loop only stops once a pass measures a zero offset, so the total known after pass N is
+    usually the final one. Encoding it while pass N+1 runs hides the final encode behind that pass.
+    Only one encode is in flight; a new total cancels the previous one and removes its output.
+    Encodes go to INTERMEDIATE_DIR rather than the tmpfs scratch directory, which is only sized
+    for the pass files.
+
+    Attributes:
+        total_shift_ms (Optional[int]): The total the in-flight encode is for.
+        output_path (Optional[str]): Where the in-flight encode writes.
+    """
+
+    def __init__(
+        self,
+        input_file: str,
+        original_filename: str,
+        vid_props: VideoProps,
+        audio_props: AudioProps,
+        reference_number: int
+    ) -> None:
+        self.input_file = input_file
+        self.vid_props = vid_props
+        self.audio_props = audio_props
+        self.reference_number = reference_number
+        self.ext: str = SyncNetUtils.final_output_path(original_filename)[1]
+        self.total_shift_ms: Optional[int] = None
+        self.output_path: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def start(self, total_shift_ms: int) -> None:
+        """Starts encoding the final output for total_shift_ms, cancelling any earlier encode."""
+        await self.discard()
+        if total_shift_ms == 0:
+            return
+        self.total_shift_ms = total_shift_ms
+        self.output_path = os.path.join(
+            INTERMEDIATE_DIR, f"{self.reference_number:05d}_speculative_{total_shift_ms}{self.ext}"
+        )
+        logger.debug("[SpeculativeShift] Encoding total_shift_ms=%s -> '%s'", total_shift_ms, self.output_path)
+        self.task = asyncio.ensure_future(SyncNetUtils.write_final_shift(
+            self.input_file, self.output_path, total_shift_ms, self.vid_props, self.audio_props
+        ))
+
+    async def take(self, total_shift_ms: int) -> Optional[str]:
+        """Returns the encoded file if it was made for total_shift_ms, else None.
+
+        A failed encode also returns None so the caller falls back to encoding itself.
+        """
+        if self.task is None or self.total_shift_ms != total_shift_ms:
+            await self.discard()
+            return None
+        task, output_path = self.task, self.output_path
+        self.task, self.total_shift_ms, self.output_path = None, None, None
+        try:
+            await task
+        except asyncio.CancelledError:
+            await ApiUtils.run_blocking(FileUtils.remove_if_exists, output_path)
+            raise
+        except Exception as e:
+            logger.warning(f"[SpeculativeShift] Speculative encode failed, encoding again -> {e}")
+            await ApiUtils.run_blocking(FileUtils.remove_if_exists, output_path)
+            return None
+        return output_path
+
+    async def discard(self) -> None:
+        """Cancels the in-flight encode, if any, waits for its ffmpeg process to exit and removes its output."""
+        task, output_path = self.task, self.output_path
+        self.task, self.total_shift_ms, self.output_path = None, None, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug("[SpeculativeShift] Discarded encode had failed -> %s", e)
+        await ApiUtils.run_blocking(FileUtils.remove_if_exists, output_path)
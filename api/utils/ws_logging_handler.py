@@ -4,16 +4,41 @@ A custom logging handler that sends log messages over WebSocket.
 
 import asyncio
 import logging
-from api.connection_manager import broadcast
+from typing import Optional
+from api.connection_manager import broadcast_batch
 
 
 class WebSocketLogHandler(logging.Handler):
+    """
+    Broadcasts formatted log records to the connected WebSocket clients, one
+    {"messages": [...]} frame per record.
+
+    Records logged on the event loop are scheduled on it directly. Records logged from
+    other threads are handed to the last loop the handler saw (or the one it was given)
+    with run_coroutine_threadsafe, and dropped when no loop is running to send them.
+    """
+
+    def __init__(self, level: int = logging.NOTSET, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        super().__init__(level)
+        self.loop: Optional[asyncio.AbstractEventLoop] = loop
+
     def emit(self, record: logging.LogRecord) -> None:
         """
         Emits a log record over a WebSocket.
-        
+
         Args:
             record (logging.LogRecord): The log record to send.
         """
-        msg: str = self.format(record)
-        asyncio.create_task(broadcast(msg))
+        try:
+            msg: str = self.format(record)
+            try:
+                loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self.loop = loop
+                loop.create_task(broadcast_batch([msg]))
+            elif self.loop is not None and self.loop.is_running():
+                asyncio.run_coroutine_threadsafe(broadcast_batch([msg]), self.loop)
+        except Exception:
+            self.handleError(record)
@@ -1,8 +1,21 @@
+import functools
+
 import torch
 
-if torch.cuda.is_available():
-   DEVICE = "cuda"
-   print("CUDA is enabled. Using GPU:", torch.cuda.get_device_name(torch.cuda.current_device()))
-else:
-    DEVICE = "cpu"
+
+@functools.lru_cache(maxsize=None)
+def get_device():
+    # Resolved on first use: torch.cuda.is_available() initialises the CUDA driver, which
+    # runs that never build a model (e.g. pipeline passes reusing earlier face tracks) can skip.
+    if torch.cuda.is_available():
+        print("CUDA is enabled. Using GPU:", torch.cuda.get_device_name(torch.cuda.current_device()))
+        return "cuda"
     print("No CUDA device found. Falling back to CPU.")
+    return "cpu"
+
+
+def __getattr__(name):
+    # Keeps `device_config.DEVICE` working for existing callers.
+    if name == "DEVICE":
+        return get_device()
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
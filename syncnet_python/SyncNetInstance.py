@@ -4,36 +4,57 @@
 
 import torch
 import numpy
-import time, pdb, argparse, subprocess, os, math, glob
+import time, pdb, argparse, os, math, glob
 import cv2
 import python_speech_features
 
 from scipy import signal
 from scipy.io import wavfile
 from .SyncNetModel import *  
+from .shell import run_shell
 from shutil import rmtree
-from device_config import DEVICE
+from device_config import get_device
 
 # ==================== Get OFFSET ====================
 
 def calc_pdist(feat1, feat2, vshift=10):
+    # Row i, column k is the distance between frame i's video feature and the audio feature
+    # k - vshift frames away. Looping over the 2*vshift+1 shifts instead of the frames keeps
+    # the Python loop short and each call covers every frame, without materialising windows.
     win_size = vshift * 2 + 1
     feat2p = torch.nn.functional.pad(feat2, (0, 0, vshift, vshift))
-    dists = []
-    for i in range(len(feat1)):
-        dists.append(torch.nn.functional.pairwise_distance(
-            feat1[[i], :].repeat(win_size, 1),
-            feat2p[i:i+win_size, :]
-        ))
-    return dists
+    n = len(feat1)
+    return torch.stack([
+        torch.nn.functional.pairwise_distance(feat1, feat2p[k:k+n, :])
+        for k in range(win_size)
+    ], 1)
 
 # ==================== MAIN DEF ====================
 
 class SyncNetInstance(torch.nn.Module):
     def __init__(self, dropout=0, num_layers_in_fc_layers=1024):
         super(SyncNetInstance, self).__init__()
-        self.__S__ = S(num_layers_in_fc_layers=num_layers_in_fc_layers).to(DEVICE)
+        self.device = get_device()
+        self.__S__ = S(num_layers_in_fc_layers=num_layers_in_fc_layers).to(self.device)
+        self.dtype = torch.float32
+
+    def use_half(self):
+        # FP16 only pays off on the GPU; CPU convolutions stay in FP32.
+        if self.device != "cuda":
+            return False
+        self.__S__.half()
+        self.dtype = torch.float16
+        return True
+
+    @torch.no_grad()
+    def warm_up(self, batch_size=20):
+        # One forward pass at evaluation shapes (5-frame 224x224 crops, 20-step MFCC windows)
+        # so CUDA kernels and cuDNN's algorithm search are done before the first clip arrives.
+        self.__S__.eval()
+        self.__S__.forward_lip(torch.zeros(batch_size, 3, 5, 224, 224, device=self.device, dtype=self.dtype))
+        self.__S__.forward_aud(torch.zeros(batch_size, 1, 13, 20, device=self.device, dtype=self.dtype))
     
+    @torch.no_grad()
     def evaluate(self, opt, videofile):
         self.__S__.eval()
 
@@ -46,13 +67,13 @@ class SyncNetInstance(torch.nn.Module):
             videofile,
             os.path.join(tmp_ref_dir, '%06d.jpg')
         ))
-        subprocess.call(command, shell=True, stdout=None)
+        run_shell(command)
 
         command = ("ffmpeg -y -i %s -async 1 -ac 1 -vn -acodec pcm_s16le -ar 16000 %s" % (
             videofile,
             os.path.join(tmp_ref_dir, 'audio.wav')
         ))
-        subprocess.call(command, shell=True, stdout=None)
+        run_shell(command)
         
         images = []
         flist = glob.glob(os.path.join(tmp_ref_dir, '*.jpg'))
@@ -62,13 +83,13 @@ class SyncNetInstance(torch.nn.Module):
         im = numpy.stack(images, axis=3)
         im = numpy.expand_dims(im, axis=0)
         im = numpy.transpose(im, (0, 3, 4, 1, 2))
-        imtv = torch.from_numpy(im.astype('float32')).float().to(DEVICE)
+        imtv = torch.from_numpy(im.astype('float32')).to(self.device, dtype=self.dtype)
 
         sample_rate, audio = wavfile.read(os.path.join(tmp_ref_dir, 'audio.wav'))
         mfcc = zip(*python_speech_features.mfcc(audio, sample_rate))
         mfcc = numpy.stack([numpy.array(i) for i in mfcc])
         cc = numpy.expand_dims(numpy.expand_dims(mfcc, axis=0), axis=0)
-        cct = torch.from_numpy(cc.astype('float32')).float().to(DEVICE)
+        cct = torch.from_numpy(cc.astype('float32')).to(self.device, dtype=self.dtype)
 
         if (float(len(audio)) / 16000) != (float(len(images)) / 25):
             print("WARNING: Audio (%.4fs) and video (%.4fs) lengths are different." % (
@@ -86,16 +107,16 @@ class SyncNetInstance(torch.nn.Module):
             im_batch = [ imtv[:, :, vframe:vframe+5, :, :] 
                          for vframe in range(i, min(lastframe, i+opt.batch_size)) ]
             im_in = torch.cat(im_batch, 0)
-            im_in = im_in.to(DEVICE)
+            im_in = im_in.to(self.device)
             im_out = self.__S__.forward_lip(im_in)
-            im_feat.append(im_out.data.cpu())
+            im_feat.append(im_out.data.float().cpu())
 
             cc_batch = [ cct[:, :, :, vframe*4:vframe*4+20] 
                          for vframe in range(i, min(lastframe, i+opt.batch_size)) ]
             cc_in = torch.cat(cc_batch, 0)
-            cc_in = cc_in.to(DEVICE)
+            cc_in = cc_in.to(self.device)
             cc_out = self.__S__.forward_aud(cc_in)
-            cc_feat.append(cc_out.data.cpu())
+            cc_feat.append(cc_out.data.float().cpu())
 
         im_feat = torch.cat(im_feat, 0)
         cc_feat = torch.cat(cc_feat, 0)
@@ -103,13 +124,13 @@ class SyncNetInstance(torch.nn.Module):
         print('Compute time %.3f sec.' % (time.time() - tS))
 
         dists = calc_pdist(im_feat, cc_feat, vshift=opt.vshift)
-        mdist = torch.mean(torch.stack(dists, 1), 1)
+        mdist = torch.mean(dists, 0)
 
         minval, minidx = torch.min(mdist, 0)
         offset = opt.vshift - minidx
         conf = torch.median(mdist) - minval
 
-        fdist = numpy.stack([dist[minidx].numpy() for dist in dists])
+        fdist = dists[:, minidx].numpy()
         fconf = torch.median(mdist).numpy() - fdist
         fconfm = signal.medfilt(fconf, kernel_size=9)
         
@@ -118,9 +139,10 @@ class SyncNetInstance(torch.nn.Module):
         print(fconfm)
         print('AV offset: \t%d \nMin dist: \t%.3f\nConfidence: \t%.3f' % (offset, minval, conf))
 
-        dists_npy = numpy.array([ dist.numpy() for dist in dists ])
+        dists_npy = dists.numpy()
         return offset.numpy(), conf.numpy(), dists_npy
 
+    @torch.no_grad()
     def extract_feature(self, opt, videofile):
         self.__S__.eval()
         
@@ -134,7 +156,7 @@ class SyncNetInstance(torch.nn.Module):
         im = numpy.stack(images, axis=3)
         im = numpy.expand_dims(im, axis=0)
         im = numpy.transpose(im, (0, 3, 4, 1, 2))
-        imtv = torch.from_numpy(im.astype('float32')).float().to(DEVICE)
+        imtv = torch.from_numpy(im.astype('float32')).to(self.device, dtype=self.dtype)
         
         lastframe = len(images) - 4
         im_feat = []
@@ -142,9 +164,9 @@ class SyncNetInstance(torch.nn.Module):
         for i in range(0, lastframe, opt.batch_size):
             im_batch = [ imtv[:, :, vframe:vframe+5, :, :] 
                          for vframe in range(i, min(lastframe, i+opt.batch_size)) ]
-            im_in = torch.cat(im_batch, 0).to(DEVICE)
+            im_in = torch.cat(im_batch, 0).to(self.device)
             im_out = self.__S__.forward_lipfeat(im_in)
-            im_feat.append(im_out.data.cpu())
+            im_feat.append(im_out.data.float().cpu())
         im_feat = torch.cat(im_feat, 0)
 
         print('Compute time %.3f sec.' % (time.time() - tS))
@@ -8,15 +8,15 @@ from torchvision import transforms
 from .nets import S3FDNet
 from .box_utils import nms_
 from api.config.settings import BASE_DIR  
-from device_config import DEVICE
+from device_config import get_device
 
 PATH_WEIGHT = os.path.join(BASE_DIR, "syncnet_python", "detectors", "s3fd", "weights", "sfd_face.pth")
 img_mean = np.array([104., 117., 123.])[:, np.newaxis, np.newaxis].astype('float32')
 
 class S3FD():
-    def __init__(self, device=DEVICE):
+    def __init__(self, device=None):
         tstamp = time.time()
-        self.device = torch.device(device)
+        self.device = torch.device(device or get_device())
         print('[S3FD] loading with', self.device)
         self.net = S3FDNet(device=self.device).to(self.device)
         state_dict = torch.load(PATH_WEIGHT, map_location=self.device)
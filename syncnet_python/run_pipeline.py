@@ -1,4 +1,4 @@
-import sys, time, os, pdb, argparse, pickle, subprocess, glob, cv2
+import sys, time, os, argparse, pickle, glob, cv2
 import numpy as np
 from shutil import rmtree
 
@@ -10,31 +10,41 @@ from scenedetect.stats_manager import StatsManager
 from scenedetect.detectors import ContentDetector
 
 from scipy.interpolate import interp1d
-from scipy.io import wavfile
 from scipy import signal
-from device_config import DEVICE
+from device_config import get_device
 
 from .detectors.s3fd import S3FD
+from .shell import run_shell
 
 # ========== PARSE ARGS ==========
-parser = argparse.ArgumentParser(description = "FaceTracker")
-parser.add_argument('--data_dir',       type=str, default='syncnet_python/data/work', help='Output directory')
-parser.add_argument('--videofile',      type=str, default='',   help='Input video file')
-parser.add_argument('--reference',      type=str, default='',   help='Video reference')
-parser.add_argument('--facedet_scale',  type=float, default=0.25, help='Scale factor for face detection')
-parser.add_argument('--crop_scale',     type=float, default=0.40, help='Scale bounding box')
-parser.add_argument('--min_track',      type=int, default=100,  help='Minimum facetrack duration')
-parser.add_argument('--frame_rate',     type=int, default=25,   help='Frame rate')
-parser.add_argument('--num_failed_det', type=int, default=25,   help='Number of missed detections allowed before tracking is stopped')
-parser.add_argument('--min_face_size',  type=int, default=100,  help='Minimum face size in pixels')
-opt = parser.parse_args()
-
-# Set additional paths
-setattr(opt, 'avi_dir', os.path.join(opt.data_dir, 'pyavi'))
-setattr(opt, 'tmp_dir', os.path.join(opt.data_dir, 'pytmp'))
-setattr(opt, 'work_dir', os.path.join(opt.data_dir, 'pywork'))
-setattr(opt, 'crop_dir', os.path.join(opt.data_dir, 'pycrop'))
-setattr(opt, 'frames_dir', os.path.join(opt.data_dir, 'pyframes'))
+def build_parser():
+  parser = argparse.ArgumentParser(description = "FaceTracker")
+  parser.add_argument('--data_dir',       type=str, default='syncnet_python/data/work', help='Output directory')
+  parser.add_argument('--videofile',      type=str, default='',   help='Input video file')
+  parser.add_argument('--reference',      type=str, default='',   help='Video reference')
+  parser.add_argument('--facedet_scale',  type=float, default=0.25, help='Scale factor for face detection')
+  parser.add_argument('--crop_scale',     type=float, default=0.40, help='Scale bounding box')
+  parser.add_argument('--min_track',      type=int, default=100,  help='Minimum facetrack duration')
+  parser.add_argument('--frame_rate',     type=int, default=25,   help='Frame rate')
+  parser.add_argument('--num_failed_det', type=int, default=25,   help='Number of missed detections allowed before tracking is stopped')
+  parser.add_argument('--min_face_size',  type=int, default=100,  help='Minimum face size in pixels')
+  parser.add_argument('--reuse_reference', type=str, default='', help='Earlier reference of the same video stream whose face tracks and crops to reuse')
+  return parser
+
+def parse_options(argv=None):
+  opt = build_parser().parse_args(argv)
+
+  # Set additional paths
+  setattr(opt, 'avi_dir', os.path.join(opt.data_dir, 'pyavi'))
+  setattr(opt, 'tmp_dir', os.path.join(opt.data_dir, 'pytmp'))
+  setattr(opt, 'work_dir', os.path.join(opt.data_dir, 'pywork'))
+  setattr(opt, 'crop_dir', os.path.join(opt.data_dir, 'pycrop'))
+  setattr(opt, 'frames_dir', os.path.join(opt.data_dir, 'pyframes'))
+  return opt
+
+# ========== LOAD DETECTOR ==========
+def load_detector():
+  return S3FD(device=get_device())
 
 # ========== IOU FUNCTION ==========
 def bb_intersection_over_union(boxA, boxB):
@@ -133,12 +143,27 @@ def crop_video(opt, track, cropfile):
     
     vOut.write(cv2.resize(face, (224,224)))
 
+  vOut.release()
+
+  crop_audio_and_mux(opt, track, cropfile, cropfile + 't.avi')
+
+  os.remove(cropfile + 't.avi')
+
+  print('Mean pos: x %.2f y %.2f s %.2f' % (
+      np.mean(dets['x']),
+      np.mean(dets['y']),
+      np.mean(dets['s'])
+  ))
+
+  return {'track': track, 'proc_track': dets}
+
+# ========== CROP AUDIO AND MUX WITH A CROPPED VIDEO ==========
+def crop_audio_and_mux(opt, track, cropfile, video_source):
+
   audiotmp    = os.path.join(opt.tmp_dir, opt.reference, 'audio.wav')
   audiostart  = (track['frame'][0])/opt.frame_rate
   audioend    = (track['frame'][-1]+1)/opt.frame_rate
 
-  vOut.release()
-
   # ========== CROP AUDIO FILE ==========
 
   command = ("ffmpeg -y -i %s -ss %.3f -to %.3f %s" % (
@@ -147,41 +172,56 @@ def crop_video(opt, track, cropfile):
       audioend,
       audiotmp
   )) 
-  output = subprocess.call(command, shell=True, stdout=None)
+  output = run_shell(command)
 
   if output != 0:
-    pdb.set_trace()
-
-  sample_rate, audio = wavfile.read(audiotmp)
+    raise RuntimeError('ffmpeg failed to crop audio for %s (exit code %d)' % (cropfile, output))
 
   # ========== COMBINE AUDIO AND VIDEO FILES ==========
 
-  command = ("ffmpeg -y -i %st.avi -i %s -c:v copy -c:a copy %s.avi" % (
-      cropfile,
+  command = ("ffmpeg -y -i %s -i %s -map 0:v -map 1:a -c:v copy -c:a copy %s.avi" % (
+      video_source,
       audiotmp,
       cropfile
   ))
-  output = subprocess.call(command, shell=True, stdout=None)
+  output = run_shell(command)
 
   if output != 0:
-    pdb.set_trace()
+    raise RuntimeError('ffmpeg failed to mux %s.avi (exit code %d)' % (cropfile, output))
 
   print('Written %s' % cropfile)
 
-  os.remove(cropfile + 't.avi')
+# ========== REUSE FACE TRACKS ==========
+def reuse_tracks(opt):
+  """Re-crops only the audio, pairing it with the face crops of opt.reuse_reference.
 
-  print('Mean pos: x %.2f y %.2f s %.2f' % (
-      np.mean(dets['x']),
-      np.mean(dets['y']),
-      np.mean(dets['s'])
+  Later sync passes only shift the audio and stream-copy the video, so the face detection,
+  tracking and video crops of the previous pass still hold; only audio.wav is re-extracted.
+  """
+  with open(os.path.join(opt.work_dir, opt.reuse_reference, 'tracks.pckl'), 'rb') as fil:
+    vidtracks = pickle.load(fil)
+
+  audio_output = os.path.join(opt.avi_dir, opt.reference, 'audio.wav')
+  command = ("ffmpeg -y -i %s -vn -async 1 -ac 1 -acodec pcm_s16le -ar 16000 %s" % (
+      opt.videofile,
+      audio_output
   ))
+  output = run_shell(command)
+  if output != 0:
+    raise RuntimeError('ffmpeg failed to extract audio from %s (exit code %d)' % (opt.videofile, output))
 
-  return {'track': track, 'proc_track': dets}
+  for ii, vidtrack in enumerate(vidtracks):
+    cropfile = os.path.join(opt.crop_dir, opt.reference, '%05d' % ii)
+    previous = os.path.join(opt.crop_dir, opt.reuse_reference, '%05d.avi' % ii)
+    crop_audio_and_mux(opt, vidtrack['track'], cropfile, previous)
+
+  return vidtracks
 
 # ========== FACE DETECTION ==========
-def inference_video(opt):
+def inference_video(opt, DET=None):
 
-  DET = S3FD(device=DEVICE)
+  if DET is None:
+    DET = load_detector()
 
   flist = glob.glob(os.path.join(opt.frames_dir, opt.reference, '*.jpg'))
   flist.sort()
@@ -254,7 +294,7 @@ def scene_detect(opt):
 # ========== EXECUTE DEMO ==========
 # ========== DELETE EXISTING DIRECTORIES ==========
 
-def main():
+def main(opt, detector=None):
     try:
         dirs_to_remove = [
             os.path.join(opt.work_dir, opt.reference),
@@ -280,30 +320,38 @@ def main():
         for directory in dirs_to_create:
             os.makedirs(directory, exist_ok=True)
 
+        # ========== REUSE THE PREVIOUS PASS'S TRACKS ==========
+        if opt.reuse_reference and os.path.exists(os.path.join(opt.work_dir, opt.reuse_reference, 'tracks.pckl')):
+            vidtracks = reuse_tracks(opt)
+
+            with open(os.path.join(opt.work_dir, opt.reference, 'tracks.pckl'), 'wb') as fil:
+                pickle.dump(vidtracks, fil)
+
+            rmtree(os.path.join(opt.tmp_dir, opt.reference))
+            return
+
         # ========== CONVERT VIDEO AND EXTRACT FRAMES ==========
+        # One decode feeds all three outputs: the 25 fps AVI, its frames and the
+        # 16 kHz mono audio. The frames and audio use the same -r 25 / -async 1
+        # conversion as the AVI, so frame numbers and timing stay aligned with it.
         video_output = os.path.join(opt.avi_dir, opt.reference, 'video.avi')
-        command = ("ffmpeg -y -i %s -qscale:v 2 -async 1 -r 25 %s" % (
-            opt.videofile,
-            video_output
-        ))
-        output = subprocess.call(command, shell=True, stdout=None)
-
         frames_output = os.path.join(opt.frames_dir, opt.reference, '%06d.jpg')
-        command = ("ffmpeg -y -i %s -qscale:v 2 -threads 1 -f image2 %s" % (
-            video_output,
-            frames_output
-        )) 
-        output = subprocess.call(command, shell=True, stdout=None)
-
         audio_output = os.path.join(opt.avi_dir, opt.reference, 'audio.wav')
-        command = ("ffmpeg -y -i %s -ac 1 -vn -acodec pcm_s16le -ar 16000 %s" % (
+        command = ("ffmpeg -y -i %s "
+                   "-qscale:v 2 -async 1 -r 25 %s "
+                   "-an -qscale:v 2 -r 25 -f image2 %s "
+                   "-vn -async 1 -ac 1 -acodec pcm_s16le -ar 16000 %s" % (
+            opt.videofile,
             video_output,
+            frames_output,
             audio_output
-        )) 
-        output = subprocess.call(command, shell=True, stdout=None)
+        ))
+        output = run_shell(command)
+        if output != 0:
+            raise RuntimeError('ffmpeg failed to convert %s (exit code %d)' % (opt.videofile, output))
 
         # ========== FACE DETECTION ==========
-        faces = inference_video(opt)
+        faces = inference_video(opt, detector)
 
         # ========== SCENE DETECTION ==========
         scene = scene_detect(opt)
@@ -336,4 +384,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(parse_options())
\ No newline at end of file
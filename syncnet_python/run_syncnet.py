@@ -4,43 +4,63 @@ from .SyncNetInstance import *
 
 # ==================== PARSE ARGUMENT ====================
 
-parser = argparse.ArgumentParser(description="SyncNet")
-parser.add_argument('--initial_model', type=str, default="syncnet_python/data/syncnet_v2.model", help='Path to the pre-trained model.')
-parser.add_argument('--batch_size', type=int, default=20, help='Batch size for processing.')
-parser.add_argument('--vshift', type=int, default=15, help='Max shift for evaluation.')
-parser.add_argument('--data_dir', type=str, default='syncnet_python/data/work', help='Base directory for data.')
-parser.add_argument('--videofile', type=str, default='', help='Path to the input video file.')
-parser.add_argument('--reference', type=str, default='', help='Reference string for output files.')
-opt = parser.parse_args()
+def build_parser():
+    parser = argparse.ArgumentParser(description="SyncNet")
+    parser.add_argument('--initial_model', type=str, default="syncnet_python/data/syncnet_v2.model", help='Path to the pre-trained model.')
+    parser.add_argument('--batch_size', type=int, default=20, help='Batch size for processing.')
+    parser.add_argument('--vshift', type=int, default=15, help='Max shift for evaluation.')
+    parser.add_argument('--data_dir', type=str, default='syncnet_python/data/work', help='Base directory for data.')
+    parser.add_argument('--videofile', type=str, default='', help='Path to the input video file.')
+    parser.add_argument('--reference', type=str, default='', help='Reference string for output files.')
+    parser.add_argument('--fp16', action='store_true', help='Run the model in half precision on CUDA.')
+    return parser
 
-setattr(opt, 'avi_dir', os.path.join(opt.data_dir, 'pyavi'))
-setattr(opt, 'tmp_dir', os.path.join(opt.data_dir, 'pytmp'))
-setattr(opt, 'work_dir', os.path.join(opt.data_dir, 'pywork'))
-setattr(opt, 'crop_dir', os.path.join(opt.data_dir, 'pycrop'))
+def parse_options(argv=None):
+    opt = build_parser().parse_args(argv)
 
-# ==================== LOAD MODEL AND FILE LIST ====================
+    setattr(opt, 'avi_dir', os.path.join(opt.data_dir, 'pyavi'))
+    setattr(opt, 'tmp_dir', os.path.join(opt.data_dir, 'pytmp'))
+    setattr(opt, 'work_dir', os.path.join(opt.data_dir, 'pywork'))
+    setattr(opt, 'crop_dir', os.path.join(opt.data_dir, 'pycrop'))
+    return opt
 
-s = SyncNetInstance()
+# ==================== LOAD MODEL ====================
 
-s.loadParameters(opt.initial_model)
-print("Model %s loaded." % opt.initial_model)
+def load_model(initial_model, fp16=False):
+    s = SyncNetInstance()
 
-flist = glob.glob(os.path.join(opt.crop_dir, opt.reference, '0*.avi'))
-flist.sort()
+    s.loadParameters(initial_model)
+    print("Model %s loaded." % initial_model)
+    if fp16 and s.use_half():
+        print("Running the model in FP16.")
+    return s
 
-# ==================== GET OFFSETS ====================
+# ==================== MAIN ====================
 
-dists = []
-for idx, fname in enumerate(flist):
-    offset, conf, dist = s.evaluate(opt, videofile=fname)
-    dists.append(dist)
+def main(opt, model=None):
+    if model is None:
+        model = load_model(opt.initial_model, opt.fp16)
 
-# ==================== PRINT RESULTS TO FILE ====================
+    flist = glob.glob(os.path.join(opt.crop_dir, opt.reference, '0*.avi'))
+    flist.sort()
 
-output_path = os.path.join(opt.work_dir, opt.reference, 'activesd.pckl')
-os.makedirs(os.path.dirname(output_path), exist_ok=True)  # Ensure the output directory exists
+    # ==================== GET OFFSETS ====================
 
-with open(output_path, 'wb') as fil:
-    pickle.dump(dists, fil)
+    dists = []
+    for idx, fname in enumerate(flist):
+        offset, conf, dist = model.evaluate(opt, videofile=fname)
+        dists.append(dist)
 
-print(f"Offsets saved to {output_path}")
\ No newline at end of file
+    # ==================== PRINT RESULTS TO FILE ====================
+
+    output_path = os.path.join(opt.work_dir, opt.reference, 'activesd.pckl')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)  # Ensure the output directory exists
+
+    with open(output_path, 'wb') as fil:
+        pickle.dump(dists, fil)
+
+    print(f"Offsets saved to {output_path}")
+
+
+if __name__ == '__main__':
+    main(parse_options())
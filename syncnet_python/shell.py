@@ -0,0 +1,12 @@
+import subprocess, sys
+
+# ========== RUN A SHELL COMMAND ==========
+def run_shell(command):
+  """Runs a shell command and writes its combined stdout and stderr to sys.stdout.
+
+  Children that inherit the file descriptors bypass sys.stdout, so inside the SyncNet server their
+  output would miss the per-request capture that the subprocess path gets through its pipe.
+  """
+  result = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+  sys.stdout.write(result.stdout.decode('utf-8', 'replace'))
+  return result.returncode